@@ -1,7 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import random
-from pulp import LpProblem, LpVariable, LpMinimize, lpSum
+from classoptimizer.grid import PreferenceGrid
+from classoptimizer.results import USER_CACHE_DIR, ResultCache
 
 # Data Storage
 classes = {}
@@ -9,73 +10,36 @@ students = {}
 preferences = {}
 availabilities = {}
 weight_fill = 50
+engine = "highs"
+# Re-optimizing an unchanged roster reuses the last result
+results = ResultCache(cache_dir=USER_CACHE_DIR)
 
 # Function to Run Optimization
 def optimize_schedule():
-    rankings = {}
     max_dissatisfaction = 10
 
-    for student, top_5 in preferences.items():
-        for class_name in classes:
-            if class_name in top_5:
-                rankings[(student, class_name)] = top_5.index(class_name) + 1
-            elif class_name in availabilities.get(student, []):  # Check availability
-                rankings[(student, class_name)] = max_dissatisfaction
-            else:
-                rankings[(student, class_name)] = float('inf')  # Unavailable classes
+    # Top 5 lists become ranks 1-5; only feasible (student, class) pairs enter the model
+    grid = PreferenceGrid.from_dicts(classes, preferences, availabilities)
 
-    # Optimization setup
-    problem = LpProblem("TAAssignment", LpMinimize)
-
-    # Decision variables for assignments
-    x = LpVariable.dicts("assign", [(s, c) for s in students for c in classes], cat="Binary")
-    
-    # Penalty variables for unfilled slots
-    unfilled_penalty = LpVariable.dicts("unfilled", classes.keys(), lowBound=0, cat="Continuous")
-
-    # Objective: Minimize dissatisfaction and unfilled class penalties
-    problem += (
-        lpSum(
-            rankings[(s, c)] * x[(s, c)] for s in students for c in classes if rankings[(s, c)] != float('inf')
-        ) +
-        weight_fill*lpSum(unfilled_penalty[c] for c in classes),  # Add penalty for unfilled slots
-        "TotalDissatisfaction"
-    )
-    
-    # Constraints: Each student gets one class
-    for s in students:
-        problem += lpSum(x[(s, c)] for c in classes if rankings[(s, c)] != float('inf')) == 1, f"OneClassPerStudent_{s}"
-
-    # Constraints: Class capacities
-    for c in classes:
-        # Define the number of assigned students for each class
-        assigned_students = lpSum(x[(s, c)] for s in students if rankings[(s, c)] != float('inf'))
-        # Enforce the capacity and track unfilled slots
-        problem += assigned_students <= classes[c], f"ClassCapacity_{c}"
-        problem += unfilled_penalty[c] >= (classes[c] - assigned_students), f"UnfilledPenalty_{c}"
-
-    # Solve the problem
-    problem.solve()
+    # Solve with the selected engine ("cbc", "highs", "flow" or "scipy")
+    solution, hit = results.solve(grid, engine, max_dissatisfaction, weight_fill)
 
     # Output results
-    assignments = {}
-    for s in students:
-        for c in classes:
-            if x[(s, c)].value() == 1:
-                assignments[s] = c
+    assignments = solution.assignments()
 
     # Display Results
     results_window = tk.Toplevel(root)
     results_window.title("Optimization Results")
-    results_text = f"Total Dissatisfaction: {problem.objective.value()}\n\nAssignments:\n"
-    for student, assigned_class in assignments.items():
-        # Get the ranking of the assigned class for the student from the rankings dictionary
-        ranking = rankings.get((student, assigned_class), "N/A")
+    results_text = f"Total Dissatisfaction: {solution.total_dissatisfaction}\n\nAssignments:\n"
+    for student, (assigned_class, ranking) in assignments.items():
         results_text += f"{student} -> {assigned_class} (Ranking: {ranking})\n"
 
+    if hit:
+        results_text += f"\nReused a cached result ({results.stats()})\n"
     results_text += "\nUnfilled Classes:\n"
-    for c in classes:
-        results_text += f"{c}: {unfilled_penalty[c].value()} unfilled slots\n"
+    unfilled = solution.unfilled()
+    for j, c in enumerate(grid.classes):
+        results_text += f"{c}: {unfilled[j]} unfilled slots\n"
 
     tk.Label(results_window, text=results_text, justify="left").pack(padx=10, pady=10)
 
@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['SpreadIMPORT2.py'],
-    pathex=[],
+    pathex=['..'],
     binaries=[('C:/Users/joshu/Python/Jaswal/cbc.exe', '.')],
     datas=[],
     hiddenimports=['pandas', 'tkinter', 'collections', 'pulp'],
@@ -1,8 +1,12 @@
+import os
+import sys
 import pandas as pd
 import tkinter as tk
 from tkinter import scrolledtext, filedialog, messagebox
-import numpy as np
-from scipy.optimize import linear_sum_assignment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from classoptimizer.grid import parse_preference_grid
+from classoptimizer.transport import solve_capacitated_assignment
 
 def sanitize_name(name):
     return name.strip().replace("[", "").replace("]", "")
@@ -45,66 +49,24 @@ def optimize_schedule():
     student_df = pd.read_excel(student_file)
     class_df = pd.read_excel(class_file, names=["Class", "Capacity"])
     class_df["Class"] = class_df["Class"].apply(sanitize_name)
-    
-    expanded_classes = []
-    class_capacities = {}
-    for _, row in class_df.iterrows():
-        class_name = row["Class"]
-        capacity = int(row["Capacity"])
-        for i in range(capacity):
-            expanded_classes.append(f"{class_name}_{i+1}")
-        class_capacities[class_name] = capacity
-    
-    students = student_df["First Name"] + " " + student_df["Last Name"]
-    preferences = {}
-    availabilities = {}
-    
-    for _, row in student_df.iterrows():
-        student_name = row["First Name"] + " " + row["Last Name"]
-        ranks = {}
-        available_classes = []
+    classes = class_df.set_index("Class")["Capacity"].astype(int).to_dict()
 
-        for col in student_df.columns[2:]:
-            if "Rank" in col and pd.notna(row[col]):
-                class_name = sanitize_name(col.split("[")[1].strip("]") if "[" in col and "]" in col else col.replace("Rank ", "").strip())
-                ranks[class_name] = int(row[col])
-            elif "Available" in col and row[col] == "Available":
-                class_name = sanitize_name(col.split("[")[1].strip("]") if "[" in col and "]" in col else col.replace("Available ", "").strip())
-                available_classes.append(class_name)
-        
-        preferences[student_name] = ranks
-        availabilities[student_name] = available_classes
-    
+    # Costs stay at class granularity; capacities are handled by the engine, not by seat columns
+    grid = parse_preference_grid(student_df, classes, sanitize=sanitize_name)
     max_dissatisfaction = 10
-    num_students = len(students)
-    num_expanded_classes = len(expanded_classes)
-    cost_matrix = np.full((num_students, num_expanded_classes), np.inf)
-
-    student_list = list(students)
-    class_list = expanded_classes
-    
-    for i, student in enumerate(student_list):
-        for j, expanded_class in enumerate(class_list):
-            base_class = "_".join(expanded_class.split("_")[:-1])
-            if base_class in preferences[student]:
-                cost_matrix[i, j] = preferences[student][base_class]
-            elif base_class in availabilities.get(student, []):
-                cost_matrix[i, j] = max_dissatisfaction
-    
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    total_dissatisfaction = cost_matrix[row_ind, col_ind].sum()
+    solution = solve_capacitated_assignment(grid, max_dissatisfaction)
+    total_dissatisfaction = solution.total_rank
 
     result_lines = []
-    assigned_students = set()
-    for i, j in zip(row_ind, col_ind):
-        result_lines.append(f"{student_list[i]} -> {class_list[j].split('_')[0]} (Rank: {int(cost_matrix[i, j])})")
-        assigned_students.add(student_list[i])
-    
-    unassigned_students = set(student_list) - assigned_students
-    for student in unassigned_students:
+    for student, (class_name, rank) in solution.assignments().items():
+        result_lines.append(f"{student} -> {class_name} (Rank: {rank})")
+
+    for student in solution.unassigned():
         result_lines.append(f"{student} -> No Class Assigned")
     
     result_text = f"Total Dissatisfaction: {total_dissatisfaction}\n\nAssignments:\n" + "\n".join(result_lines)
+    if solution.status != "Optimal":
+        result_text = f"⚠️ Solver status: {solution.status} ({len(solution.unassigned())} students not placed)\n\n" + result_text
     show_results_window(result_text)
 
 if __name__ == "__main__":
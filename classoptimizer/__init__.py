@@ -0,0 +1 @@
+"""Shared optimization code for the ClassOptimizer scripts."""
@@ -0,0 +1,124 @@
+"""Batch runs: many student/class file pairs from one manifest.
+
+The manifest is a CSV with `name`, `student_file` and `class_file` columns
+(paths relative to the manifest). Optional `engine`, `max_dissatisfaction`,
+`weight_fill`, `mode` and `time_limit` columns override the batch settings
+for that row. Each job is loaded and solved in its own worker process
+through run_schedule, writing its own full report. The batch then writes
+`assignments.csv` (every job's students) and `jobs.csv` (status, totals
+and load/solve/wall seconds per job).
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Per-row overrides and how to parse them
+JOB_SETTINGS = {"engine": str, "mode": str, "max_dissatisfaction": int, "weight_fill": float, "time_limit": float}
+JOB_COLUMNS = ("job", "status", "engine", "total_dissatisfaction", "assigned", "students", "unfilled_slots",
+               "load_s", "solve_s", "wall_s", "path", "error")
+ASSIGNMENT_COLUMNS = ("job", "student", "class", "rank")
+
+
+def read_manifest(path, defaults=None):
+    """Reads the manifest into job dicts: name, both file paths and run_schedule keywords."""
+    base = os.path.dirname(os.path.abspath(path))
+    jobs, names = [], set()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for number, row in enumerate(csv.DictReader(f), start=1):
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if not row.get("student_file") or not row.get("class_file"):
+                raise ValueError(f"{path}, row {number}: student_file and class_file are required")
+            job = dict(defaults or {})
+            job["name"] = row.get("name") or f"job{number}"
+            if job["name"] in names:
+                raise ValueError(f"{path}, row {number}: duplicate job name {job['name']!r}")
+            names.add(job["name"])
+            job["student_file"] = os.path.join(base, row["student_file"])
+            job["class_file"] = os.path.join(base, row["class_file"])
+            for key, parse in JOB_SETTINGS.items():
+                if row.get(key):
+                    job[key] = parse(row[key])
+            jobs.append(job)
+    return jobs
+
+
+def run_job(job):
+    """Worker entry point: solves one job; returns (summary row, assignment rows)."""
+    from .report import QUIET, Report
+    from .schedule import run_schedule
+
+    start = time.perf_counter()
+    settings = {key: value for key, value in job.items()
+                if key not in ("name", "student_file", "class_file", "report_path")}
+    settings["workers"] = 1  # The batch already runs one job per process
+    summary = {"job": job["name"], "status": "Error", "engine": settings.get("engine", "cbc"), "error": ""}
+    rows, timings = [], {}
+    try:
+        report = Report(QUIET, job.get("report_path"))
+        with report:
+            solution = run_schedule(job["student_file"], job["class_file"], report, **settings)
+        timings = dict(report.timings)
+    except Exception as exc:
+        summary["error"] = f"{type(exc).__name__}: {exc}"
+    else:
+        assignments = solution.assignments()
+        summary.update(
+            status=solution.status,
+            total_dissatisfaction=solution.total_dissatisfaction,
+            assigned=len(assignments),
+            students=len(solution.grid.students),
+            unfilled_slots=sum(solution.unfilled_classes().values()),
+            path=solution.path,
+        )
+        rows = [(job["name"], student, c, rank) for student, (c, rank) in assignments.items()]
+    summary["load_s"] = round(timings.get("load", 0.0), 3)
+    summary["solve_s"] = round(timings.get("solve", 0.0), 3)
+    summary["wall_s"] = round(time.perf_counter() - start, 3)
+    return summary, rows
+
+
+def _write_csv(path, columns, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def run_batch(jobs, out_dir, workers=None, report=None):
+    """Solves `jobs` across `workers` processes (None uses every core).
+
+    Writes each job's report plus `jobs.csv` and `assignments.csv` into
+    `out_dir`, and logs one line per finished job to `report`. Returns
+    the job summaries in manifest order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for job in jobs:
+        job.setdefault("report_path", os.path.join(out_dir, f"{job['name']}_report.txt"))
+
+    results = {}
+
+    def finished(summary, rows):
+        results[summary["job"]] = (summary, rows)
+        if report is not None:
+            if summary["error"]:
+                report.summary(f"❌ {summary['job']}: {summary['error']}")
+            else:
+                report.summary(f"{'✅' if summary['status'] == 'Optimal' else '⚠️'} {summary['job']}: "
+                               f"{summary['status']}, dissatisfaction {summary['total_dissatisfaction']}, "
+                               f"{summary['assigned']} of {summary['students']} assigned ({summary['wall_s']:.2f}s)")
+
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            finished(*run_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(run_job, job) for job in jobs]):
+                finished(*future.result())
+
+    ordered = [results[job["name"]] for job in jobs]
+    _write_csv(os.path.join(out_dir, "jobs.csv"), JOB_COLUMNS,
+               ([summary.get(column, "") for column in JOB_COLUMNS] for summary, _ in ordered))
+    _write_csv(os.path.join(out_dir, "assignments.csv"), ASSIGNMENT_COLUMNS,
+               (row for _, rows in ordered for row in rows))
+    return [summary for summary, _ in ordered]
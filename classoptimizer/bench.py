@@ -0,0 +1,355 @@
+"""Cross-engine benchmarks over a ladder of instance sizes.
+
+    python -m classoptimizer bench --sizes 1000x50 5000x200 20000x600 --out bench_results
+    python -m classoptimizer bench --baseline bench_results/results.json
+
+Every engine runs on every instance: the synthetic ladder (generate.py,
+written as Parquet, or CSV without pyarrow) plus the real FINALPRODUCT
+workbooks or a batch manifest. Each run is a fresh process, so its peak
+RSS is its own, and is given up on after `timeout` seconds. Per run the
+wall time of each phase (load, solve, extract), the peak RSS and the
+objective are recorded. Alongside the engines, "greedy" is the first-fit
+by rank of PANDAS_METHOD/SpreadIMPORT.py's ScheduleOptimizer, on the same
+grid, as a reference for how far the exact engines improve on it.
+
+The results go to `results.json` (with the library versions) and
+`results.csv`, and the scaling curves to `scaling_time.svg` and
+`scaling_rss.svg`. With a baseline (an earlier results.json or .csv),
+slower solves, larger peak RSS and changed objectives are reported.
+"""
+import csv
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import platform
+import signal
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ENGINES = ("cbc", "highs", "flow", "scipy", "greedy")
+SIZES = ("200x20", "1000x50", "5000x200", "20000x600")
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "FINALPRODUCT")
+REAL_INSTANCES = (
+    ("student_rankings", "student_rankings.xlsx", "class_spots.xlsx"),
+    ("student_preferences", "student_preferences.xlsx", "class_spots_fixed.xlsx"),
+)
+PHASES = ("load", "solve", "extract")
+COLUMNS = ("instance", "students", "classes", "edges", "engine", "status", "objective", "total_rank",
+           "unfilled_seats", "assigned", "load_s", "solve_s", "extract_s", "wall_s", "peak_rss_mb", "error")
+TIMEOUT = 300.0  # Seconds per run
+# Regressions smaller than these are noise
+TOLERANCE = 0.25
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 20.0
+
+
+def solve_greedy(grid, max_dissatisfaction=10, weight_fill=50):
+    """First fit by rank, in file order: ScheduleOptimizer.optimize_schedule on a PreferenceGrid."""
+    from .solution import Solution
+
+    left = np.asarray(grid.capacities, dtype=np.int64).copy()
+    assigned = np.full(len(grid.students), -1, dtype=np.int64)
+    for i, row in enumerate(grid.rank):
+        ranked = np.flatnonzero(row)
+        for j in ranked[np.argsort(row[ranked], kind="stable")].tolist():
+            if left[j] > 0:
+                assigned[i] = j
+                left[j] -= 1
+                break
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status="Feasible", engine="greedy",
+                    path="first fit by rank")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        if importlib.util.find_spec("psutil") is None:
+            return None
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 2 ** 20  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # Bytes on macOS, KB elsewhere
+
+
+def run_case(case):
+    """Loads, solves and extracts one instance with one engine; returns the result row."""
+    from .instance import read_grid
+
+    # Import what the phases use up front, so they time work rather than imports
+    import pandas  # noqa: F401
+    from . import engines, highs, ingest  # noqa: F401
+    if importlib.util.find_spec("pyarrow") is not None:
+        import pyarrow.parquet  # noqa: F401
+
+    row = {"instance": case["instance"], "engine": case["engine"], "status": "Error", "error": ""}
+    phases = {}
+    start = time.perf_counter()
+    try:
+        phase = time.perf_counter()
+        grid = read_grid(case["student_file"], case["class_file"])
+        phases["load"] = time.perf_counter() - phase
+        edges = grid.feasible_edges(case["max_dissatisfaction"])
+        row.update(students=len(grid.students), classes=len(grid.classes), edges=len(edges))
+
+        phase = time.perf_counter()
+        if case["engine"] == "greedy":
+            solution = solve_greedy(grid, case["max_dissatisfaction"], case["weight_fill"])
+        else:
+            from pulp import PULP_CBC_CMD
+
+            solver = PULP_CBC_CMD(msg=False, timeLimit=case["time_limit"]) if case["engine"] == "cbc" else None
+            solution = engines.solve(grid, case["engine"], case["max_dissatisfaction"], case["weight_fill"],
+                                     solver=solver, time_limit=case["time_limit"])
+        phases["solve"] = time.perf_counter() - phase
+
+        phase = time.perf_counter()
+        assignments = solution.assignments()
+        unfilled = int(solution.unfilled().sum())
+        phases["extract"] = time.perf_counter() - phase
+        row.update(status=solution.status, objective=solution.total_dissatisfaction, total_rank=solution.total_rank,
+                   unfilled_seats=unfilled, assigned=len(assignments))
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    row.update({f"{name}_s": round(seconds, 4) for name, seconds in phases.items()})
+    row["wall_s"] = round(time.perf_counter() - start, 4)
+    rss = peak_rss_mb()
+    row["peak_rss_mb"] = None if rss is None else round(rss, 1)
+    return row
+
+
+def _child(case, connection):
+    if hasattr(os, "setsid"):
+        os.setsid()  # Own process group, so a timeout also stops the solver executables it starts
+    connection.send(run_case(case))
+    connection.close()
+
+
+def run_isolated(case, timeout=TIMEOUT):
+    """run_case in a fresh process; a run past `timeout` is stopped and reported as "Timeout"."""
+    context = multiprocessing.get_context("spawn")
+    receive, send = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(case, send))
+    start = time.perf_counter()
+    process.start()
+    send.close()
+    row = None
+    if receive.poll(timeout):
+        try:
+            row = receive.recv()
+        except EOFError:
+            pass
+    if process.is_alive():
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        process.terminate()
+    process.join()
+    if row is None:
+        timed_out = time.perf_counter() - start >= timeout
+        row = {"instance": case["instance"], "engine": case["engine"], "status": "Timeout" if timed_out else "Error",
+               "wall_s": round(time.perf_counter() - start, 4),
+               "error": f"No result within {timeout:g}s" if timed_out else f"Exit code {process.exitcode}"}
+    return row
+
+
+def parse_size(size):
+    """"20000x600" -> (20000, 600)."""
+    students, _, classes = size.lower().partition("x")
+    return int(students), int(classes)
+
+
+def synthetic_instances(sizes, directory, seed=0, **options):
+    """Generates and writes one instance per size; returns (name, student file, class file) triples."""
+    from .generate import generate, write_instance
+
+    fmt = "parquet" if importlib.util.find_spec("pyarrow") is not None else "csv"
+    instances = []
+    for size in sizes:
+        num_students, num_classes = parse_size(size)
+        name = f"synthetic_{num_students}x{num_classes}"
+        students, classes = write_instance(generate(num_students, num_classes, seed, **options),
+                                           os.path.join(directory, name), (fmt,))
+        instances.append((name, students, classes))
+    return instances
+
+
+def real_instances(manifest=None):
+    """(name, student file, class file) for each manifest row, or the FINALPRODUCT workbooks."""
+    if manifest is not None:
+        from .batch import read_manifest
+
+        return [(job["name"], job["student_file"], job["class_file"]) for job in read_manifest(manifest)]
+    return [(name, os.path.join(FIXTURE_DIR, students), os.path.join(FIXTURE_DIR, classes))
+            for name, students, classes in REAL_INSTANCES
+            if os.path.exists(os.path.join(FIXTURE_DIR, students))]
+
+
+def run_benchmarks(instances, engines=ENGINES, max_dissatisfaction=10, weight_fill=50, time_limit=None,
+                   timeout=TIMEOUT, report=None):
+    """Runs every engine on every instance, one process at a time; returns the result rows."""
+    rows = []
+    for name, student_file, class_file in instances:
+        for engine in engines:
+            case = {"instance": name, "student_file": student_file, "class_file": class_file, "engine": engine,
+                    "max_dissatisfaction": max_dissatisfaction, "weight_fill": weight_fill, "time_limit": time_limit}
+            row = run_isolated(case, timeout)
+            rows.append(row)
+            if report is not None:
+                report.summary(describe(row))
+    return rows
+
+
+def describe(row):
+    if row.get("error"):
+        return f"❌ {row['instance']} / {row['engine']}: {row['error']}"
+    phases = ", ".join(f"{name} {row[f'{name}_s']:.3f}s" for name in PHASES if row.get(f"{name}_s") is not None)
+    rss = "" if row.get("peak_rss_mb") is None else f", {row['peak_rss_mb']:.0f} MB"
+    return f"{row['instance']} / {row['engine']}: {row['status']} {row['objective']} ({phases}{rss})"
+
+
+def environment():
+    """Versions that explain a difference between two benchmark runs."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    libraries = {}
+    for library in ("numpy", "scipy", "pandas", "pulp", "pyarrow"):
+        try:
+            libraries[library] = version(library)
+        except PackageNotFoundError:
+            pass
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "libraries": libraries, "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def write_results(rows, out_dir):
+    """Writes results.json, results.csv and both scaling charts; returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = [os.path.join(out_dir, name) for name in
+             ("results.json", "results.csv", "scaling_time.svg", "scaling_rss.svg")]
+    with open(paths[0], "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": rows}, f, indent=1)
+    with open(paths[1], "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(paths[2], "w", encoding="utf-8") as f:
+        f.write(scaling_chart(rows, "solve_s", "Solve time (s)"))
+    with open(paths[3], "w", encoding="utf-8") as f:
+        f.write(scaling_chart(rows, "peak_rss_mb", "Peak RSS (MB)"))
+    return paths
+
+
+def scaling_chart(rows, column, label, width=640, height=400):
+    """Log-log SVG of `column` against feasible edges, one line per engine (no plotting library needed)."""
+    series = {}
+    for row in rows:
+        if row.get("edges") and row.get(column) and not row.get("error"):
+            series.setdefault(row["engine"], []).append((row["edges"], row[column]))
+    left, right, top, bottom = 70, 130, 20, 50
+    lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" '
+             f'font-size="11">', f'<rect width="{width}" height="{height}" fill="white"/>']
+    points = [point for values in series.values() for point in values]
+    if not points:
+        return "\n".join(lines + ['<text x="20" y="30">No results</text>', "</svg>"]) + "\n"
+    xs = [math.log10(x) for x, _ in points]
+    ys = [math.log10(y) for _, y in points]
+    x0, x1 = math.floor(min(xs)), math.ceil(max(xs)) + (min(xs) == max(xs))
+    y0, y1 = math.floor(min(ys)), math.ceil(max(ys)) + (min(ys) == max(ys))
+    plot_w, plot_h = width - left - right, height - top - bottom
+
+    def at(x, y):
+        return (left + (math.log10(x) - x0) / (x1 - x0) * plot_w,
+                top + plot_h - (math.log10(y) - y0) / (y1 - y0) * plot_h)
+
+    for power in range(x0, x1 + 1):
+        x = left + (power - x0) / (x1 - x0) * plot_w
+        lines.append(f'<line x1="{x:.1f}" y1="{top}" x2="{x:.1f}" y2="{top + plot_h}" stroke="#ddd"/>')
+        lines.append(f'<text x="{x:.1f}" y="{top + plot_h + 15}" text-anchor="middle">1e{power}</text>')
+    for power in range(y0, y1 + 1):
+        y = top + plot_h - (power - y0) / (y1 - y0) * plot_h
+        lines.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_w}" y2="{y:.1f}" stroke="#ddd"/>')
+        lines.append(f'<text x="{left - 6}" y="{y + 4:.1f}" text-anchor="end">1e{power}</text>')
+    lines.append(f'<text x="{left + plot_w / 2}" y="{height - 12}" text-anchor="middle">Feasible (student, class) '
+                 f'pairs</text>')
+    lines.append(f'<text x="16" y="{top + plot_h / 2}" text-anchor="middle" '
+                 f'transform="rotate(-90 16 {top + plot_h / 2})">{label}</text>')
+    colors = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b")
+    for k, (engine, values) in enumerate(sorted(series.items())):
+        color = colors[k % len(colors)]
+        coords = [at(x, y) for x, y in sorted(values)]
+        lines.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="'
+                     + " ".join(f"{x:.1f},{y:.1f}" for x, y in coords) + '"/>')
+        lines += [f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{color}"/>' for x, y in coords]
+        lines.append(f'<text x="{left + plot_w + 10}" y="{top + 15 + 16 * k}" fill="{color}">{engine}</text>')
+    return "\n".join(lines + ["</svg>"]) + "\n"
+
+
+def load_results(path):
+    """Rows of an earlier results.json or results.csv."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["results"]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for column in ("objective", "solve_s", "peak_rss_mb"):
+            row[column] = float(row[column]) if row.get(column) else None
+    return rows
+
+
+def compare(rows, baseline, tolerance=TOLERANCE):
+    """Regressions against `baseline` rows, as text lines.
+
+    A run regresses when its solve time or peak RSS grows by more than
+    `tolerance` (and by more than the noise floors), when its objective
+    changes, or when it fails where the baseline did not.
+    """
+    previous = {(row["instance"], row["engine"]): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = previous.get((row["instance"], row["engine"]))
+        if old is None:
+            continue
+        name = f"{row['instance']} / {row['engine']}"
+        if row.get("error") and not old.get("error"):
+            regressions.append(f"{name}: now fails ({row['error']})")
+            continue
+        if row.get("error") or old.get("error"):
+            continue
+        if old.get("objective") is not None and row.get("objective") is not None \
+                and abs(float(row["objective"]) - float(old["objective"])) > 1e-6:
+            regressions.append(f"{name}: objective {old['objective']} -> {row['objective']}")
+        for column, floor, unit in (("solve_s", MIN_SECONDS, "s"), ("peak_rss_mb", MIN_RSS_MB, " MB")):
+            new_value, old_value = row.get(column), old.get(column)
+            if new_value is None or old_value is None:
+                continue
+            new_value, old_value = float(new_value), float(old_value)
+            if new_value > old_value * (1 + tolerance) and new_value - old_value > floor:
+                regressions.append(f"{name}: {column} {old_value:g}{unit} -> {new_value:g}{unit} "
+                                   f"(+{(new_value / old_value - 1) * 100:.0f}%)")
+    return regressions
+
+
+def bench(sizes=SIZES, real=True, manifest=None, engines=ENGINES, seed=0, out_dir="bench_results", baseline=None,
+          report=None, **settings):
+    """Benchmarks, writes the results and returns (rows, regressions)."""
+    # Read first: the baseline may be the results file about to be replaced
+    previous = load_results(baseline) if baseline is not None else None
+    with tempfile.TemporaryDirectory() as directory:
+        instances = synthetic_instances(sizes, directory, seed)
+        if real:
+            instances += real_instances(manifest)
+        rows = run_benchmarks(instances, engines, report=report, **settings)
+    write_results(rows, out_dir)
+    regressions = compare(rows, previous) if previous is not None else []
+    return rows, regressions
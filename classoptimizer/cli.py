@@ -0,0 +1,424 @@
+"""Command-line entry point: python -m classoptimizer.
+
+    python -m classoptimizer solve students.xlsx classes.xlsx --engine highs
+    python -m classoptimizer solve                      # pick both files in dialogs
+    python -m classoptimizer solve students.xlsx classes.xlsx --timings timings.jsonl --profile profiles
+    python -m classoptimizer batch manifest.csv --out results --jobs 4
+    python -m classoptimizer sweep students.xlsx classes.xlsx --weight-fill 0 10 50 200
+    python -m classoptimizer frontier students.xlsx classes.xlsx --engine highs
+    python -m classoptimizer serve --port 5000         # the endpoint index.html posts to
+    python -m classoptimizer watch responses/ --out responses/assignments.csv
+    python -m classoptimizer bench --sizes 1000x50 20000x600 --baseline bench_results/results.json
+    python -m classoptimizer corpus                    # every engine and fast path vs the golden optima
+    python -m classoptimizer generate synthetic/ --students 100000 --classes 3000 --formats parquet grid
+    python -m classoptimizer check-startup --budget 0.2
+
+Only argparse is imported up front. tkinter is imported when a file dialog
+is actually needed, and pandas / the solvers when a run reaches them, so
+`--help`, argument errors and cached headless runs start quickly.
+`check-startup` measures this in a fresh interpreter (for cron jobs).
+"""
+import argparse
+import os
+import sys
+import time
+
+ENGINES = ("cbc", "highs", "flow", "scipy")  # Same order as engines.ENGINES
+MODES = ("auto", "mip")
+VERBOSITY = ("quiet", "summary", "detail", "debug")
+# Modules that must not be imported just by loading the command line
+HEAVY_MODULES = ("numpy", "pandas", "pulp", "scipy", "tkinter")
+STARTUP_BUDGET = 0.25  # Seconds
+
+
+def ask_files(prompts=("Select Student File", "Select Class File")):
+    """Asks for one file per prompt with Tk dialogs sharing a single hidden root.
+
+    Returns the chosen paths, or None if any dialog was canceled.
+    """
+    from tkinter import Tk, filedialog
+
+    from .ingest import FILE_TYPES
+
+    root = Tk()
+    root.withdraw()  # Hide the root window
+    try:
+        paths = []
+        for prompt in prompts:
+            path = filedialog.askopenfilename(parent=root, title=prompt, filetypes=FILE_TYPES)
+            if not path:
+                return None
+            paths.append(path)
+        return paths
+    finally:
+        root.destroy()
+
+
+def default_report_path(student_file):
+    return os.path.splitext(student_file)[0] + "_report.txt"
+
+
+def solve_command(args):
+    from .report import Report
+    from .schedule import run_schedule
+    from .timing import PhaseTimer
+
+    student_file, class_file = args.student_file, args.class_file
+    if student_file is None or class_file is None:
+        files = ask_files()
+        if files is None:
+            print("File selection canceled.")
+            return 2
+        student_file, class_file = files
+
+    report_path = args.report
+    if report_path is None:
+        report_path = default_report_path(student_file)
+
+    with Report(args.verbosity, report_path or None, timer=PhaseTimer(args.profile)) as report:
+        solution = run_schedule(student_file, class_file, report, workers=args.workers,
+                                diagnostics=args.diagnostics, **solver_settings(args))
+    if args.timings:
+        report.timer.write_record(args.timings, student_file=student_file, class_file=class_file,
+                                  engine=args.engine, status=solution.status,
+                                  total_dissatisfaction=solution.total_dissatisfaction)
+    return 0 if solution.status == "Optimal" else 1
+
+
+def batch_command(args):
+    from .batch import read_manifest, run_batch
+    from .report import Report
+
+    jobs = read_manifest(args.manifest, solver_settings(args))
+    with Report(args.verbosity) as report:
+        report.summary(f"📦 {len(jobs)} jobs from {args.manifest}")
+        with report.timed("batch"):
+            summaries = run_batch(jobs, args.out, args.jobs, report)
+        failed = [summary["job"] for summary in summaries if summary["status"] != "Optimal"]
+        report.summary(f"📁 Results written to {os.path.join(args.out, 'jobs.csv')} and "
+                       f"{os.path.join(args.out, 'assignments.csv')}")
+        if failed:
+            report.summary(f"⚠️ Failed or not optimal: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+def sweep_command(args):
+    from .instance import load_grid
+    from .report import SUMMARY, Report
+    from .sweep import sweep, table_lines, write_table
+
+    settings = solver_settings(args)
+    out = args.out or os.path.splitext(args.student_file)[0] + "_sweep.csv"
+    with Report(args.verbosity) as report:
+        with report.timed("load"):
+            grid, _ = load_grid(args.student_file, args.class_file, settings["sanitize"], use_cache=settings["use_cache"])
+        with report.timed("sweep"):
+            rows = sweep(grid, args.max_dissatisfaction, args.weight_fill, settings["engine"], settings["mode"],
+                         settings["presolve"], settings["time_limit"], args.jobs)
+        report.section(SUMMARY, f"📊 {len(rows)} weight settings for {len(grid.students)} students:",
+                       table_lines(rows))
+        write_table(rows, out)
+        report.summary(f"📁 Sweep written to {out}")
+    return 0 if all(row["status"] == "Optimal" for row in rows) else 1
+
+
+def frontier_command(args):
+    from .instance import load_grid
+    from .pareto import POINT_COLUMNS, pareto_frontier, point_rows, write_frontier
+    from .report import SUMMARY, Report
+
+    sanitize = None
+    if args.sanitize:
+        from .ingest import underscore_name as sanitize
+    out = args.out or os.path.splitext(args.student_file)[0] + "_frontier"
+    with Report(args.verbosity) as report:
+        with report.timed("load"):
+            grid, _ = load_grid(args.student_file, args.class_file, sanitize, use_cache=not args.no_cache)
+        with report.timed("frontier"):
+            points = pareto_frontier(grid, args.max_dissatisfaction, args.engine, time_limit=args.time_limit)
+        rows = [POINT_COLUMNS] + point_rows(points)
+        widths = [max(len(str(row[k])) for row in rows) for k in range(len(POINT_COLUMNS))]
+        report.section(SUMMARY, f"📈 {len(points)} Pareto-optimal points (rank cost vs unfilled seats):",
+                       ("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)) for row in rows))
+        write_frontier(points, out)
+        report.summary(f"📁 Frontier written to {os.path.join(out, 'frontier.csv')} and "
+                       f"{os.path.join(out, 'assignments.csv')}")
+    return 0 if points else 1
+
+
+def serve_command(args):
+    import asyncio
+
+    from .service import HOST, serve
+    from .results import USER_CACHE_DIR
+
+    def ready(port):
+        print(f"🌐 Serving on http://{HOST}:{port}/optimize with {args.workers} warm workers (Ctrl+C to stop)",
+              flush=True)
+
+    try:
+        asyncio.run(serve(HOST, args.port, args.workers, args.queue, args.time_limit, ready,
+                          cache_dir=None if args.no_cache else USER_CACHE_DIR))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def watch_command(args):
+    from .report import Report
+    from .watch import Watcher
+
+    settings = solver_settings(args)
+    del settings["use_cache"]
+    out = args.out or os.path.join(args.directory, "assignments.csv")
+    with Report(args.verbosity) as report:
+        report.summary(f"👀 Watching {args.directory} for {args.students} and {args.classes} every "
+                       f"{args.interval:g}s (Ctrl+C to stop)")
+        watcher = Watcher(args.directory, out, report, args.students, args.classes, **settings)
+        try:
+            watcher.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def corpus_command(args):
+    from .corpus import CORPUS_PATH, check, record
+    from .report import SUMMARY, Report
+
+    path = args.corpus or CORPUS_PATH
+    with Report(args.verbosity) as report:
+        if args.record:
+            try:
+                record(path, args.cases, args.variants, report)
+            except ValueError as exc:
+                report.summary(f"❌ Nothing recorded: {exc}")
+                return 1
+            report.summary(f"📁 Corpus written to {path}")
+            return 0
+        failures, notes = check(path, args.cases, args.variants, args.max_slowdown, report)
+        if notes:
+            report.section(SUMMARY, f"📝 {len(notes)} notes:", (f"  - {line}" for line in notes))
+        if failures:
+            report.section(SUMMARY, f"❌ {len(failures)} failures:", (f"  - {line}" for line in failures))
+            return 1
+        report.summary("✅ Every variant matches the golden corpus")
+    return 0
+
+
+def generate_command(args):
+    from .generate import generate, write_instance
+
+    start = time.perf_counter()
+    grid = generate(args.students, args.classes, args.seed, args.ranks, args.skew, args.density, args.slack,
+                    args.departments, args.clustering)
+    print(f"🎲 {args.students} students x {args.classes} classes, {int(grid.capacities.sum())} seats "
+          f"({time.perf_counter() - start:.2f}s)")
+    for path in write_instance(grid, args.out, args.formats):
+        print(f"📁 {path}")
+    return 0
+
+
+def bench_command(args):
+    from .bench import bench
+    from .report import SUMMARY, Report
+
+    with Report(args.verbosity) as report:
+        rows, regressions = bench(args.sizes, not args.no_real, args.manifest, args.engines, args.seed, args.out,
+                                  args.baseline, report, max_dissatisfaction=args.max_dissatisfaction,
+                                  weight_fill=args.weight_fill, time_limit=args.time_limit, timeout=args.timeout)
+        report.summary(f"📁 {len(rows)} runs written to {args.out}")
+        if regressions:
+            report.section(SUMMARY, f"⚠️ {len(regressions)} regressions against {args.baseline}:",
+                           (f"  - {line}" for line in regressions))
+    return 1 if regressions else 0
+
+
+def solver_settings(args):
+    """run_schedule keywords shared by the solve and batch commands."""
+    sanitize = None
+    if args.sanitize:
+        from .ingest import underscore_name as sanitize
+    return {
+        "engine": args.engine,
+        "mode": args.mode,
+        "max_dissatisfaction": args.max_dissatisfaction,
+        "weight_fill": args.weight_fill,
+        "time_limit": args.time_limit,
+        "presolve": not args.no_presolve,
+        "use_cache": not args.no_cache,
+        "sanitize": sanitize,
+    }
+
+
+def startup_profile(module="classoptimizer.cli"):
+    """Imports `module` in a fresh interpreter; returns (seconds, heavy modules it pulled in).
+
+    The time is the module's cumulative `-X importtime` figure, so it
+    excludes interpreter start-up itself.
+    """
+    import subprocess
+
+    probe = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                            capture_output=True, text=True, check=True)
+    seconds = 0.0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            seconds = int(fields[1]) / 1e6
+    return seconds, result.stdout.split()
+
+
+def check_startup_command(args):
+    seconds, heavy = startup_profile(args.module)
+    ok = seconds <= args.budget and not heavy
+    print(f"{'✅' if ok else '❌'} import {args.module}: {seconds * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms)")
+    if heavy:
+        print(f"   Imported eagerly: {', '.join(heavy)}")
+    return 0 if ok else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="classoptimizer", description="Assign students to classes by preference.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solver_options = argparse.ArgumentParser(add_help=False)
+    solver_options.add_argument("--engine", choices=ENGINES, default="cbc")
+    solver_options.add_argument("--mode", choices=MODES, default="auto",
+                                help="auto: solve the LP when it is provably integral; mip: always branch and bound")
+    solver_options.add_argument("--time-limit", type=float, help="Seconds per solver call (cbc and highs)")
+    solver_options.add_argument("--no-presolve", action="store_true",
+                                help="Skip the forced/stranded student reductions")
+    solver_options.add_argument("--no-cache", action="store_true", help="Always re-read the input files and re-solve")
+    solver_options.add_argument("--sanitize", action="store_true",
+                                help="Replace non-word characters in class names with underscores")
+    weight_options = argparse.ArgumentParser(add_help=False)
+    weight_options.add_argument("--max-dissatisfaction", type=int, default=10,
+                                help="Cost of an available but unranked class (default: 10)")
+    weight_options.add_argument("--weight-fill", type=float, default=50,
+                                help="Penalty per unfilled class slot (default: 50)")
+
+    solve = commands.add_parser("solve", parents=[solver_options, weight_options],
+                                help="Optimize one student/class file pair.")
+    solve.add_argument("student_file", nargs="?", help="Student form export (file dialog if omitted)")
+    solve.add_argument("class_file", nargs="?", help="Class/capacity sheet (file dialog if omitted)")
+    solve.add_argument("--workers", type=int, help="Processes for independent components (default: one per CPU)")
+    solve.add_argument("--diagnostics", action="store_true", help="Explain why classes stay unfilled")
+    solve.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    solve.add_argument("--report", help="Full report path, .gz/.xz to compress (default: next to the student "
+                                        "file; empty string for none)")
+    solve.add_argument("--timings", help="Append the run's phase timing record to this file as one JSON line")
+    solve.add_argument("--profile", metavar="DIR", help="Profile every phase with cProfile into .prof files in DIR")
+    solve.set_defaults(run=solve_command)
+
+    batch = commands.add_parser("batch", parents=[solver_options, weight_options],
+                                help="Optimize every student/class file pair listed in a manifest.")
+    batch.add_argument("manifest", help="CSV with name, student_file and class_file columns; engine, mode, "
+                                        "max_dissatisfaction, weight_fill and time_limit columns override per job")
+    batch.add_argument("--out", default="batch_results", help="Output folder (default: %(default)s)")
+    batch.add_argument("--jobs", type=int, help="Jobs solved at once (default: one per CPU)")
+    batch.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    batch.set_defaults(run=batch_command)
+
+    sweep = commands.add_parser("sweep", parents=[solver_options],
+                                help="Solve one instance for every combination of the given weights.")
+    sweep.add_argument("student_file", help="Student form export")
+    sweep.add_argument("class_file", help="Class/capacity sheet")
+    sweep.add_argument("--max-dissatisfaction", type=int, nargs="+", default=[10],
+                       help="Costs of an available but unranked class (default: 10)")
+    sweep.add_argument("--weight-fill", type=float, nargs="+", default=[0, 10, 50, 200],
+                       help="Penalties per unfilled class slot (default: 0 10 50 200)")
+    sweep.add_argument("--jobs", type=int, help="Worker processes (default: one per CPU)")
+    sweep.add_argument("--out", help="CSV table path (default: next to the student file)")
+    sweep.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    sweep.set_defaults(run=sweep_command)
+
+    frontier = commands.add_parser("frontier", help="Trace the trade-off between rank cost and unfilled seats.")
+    frontier.add_argument("student_file", help="Student form export")
+    frontier.add_argument("class_file", help="Class/capacity sheet")
+    frontier.add_argument("--engine", choices=ENGINES[:2], default="cbc")
+    frontier.add_argument("--max-dissatisfaction", type=int, default=10,
+                          help="Cost of an available but unranked class (default: 10)")
+    frontier.add_argument("--time-limit", type=float, help="Seconds per solver call")
+    frontier.add_argument("--no-cache", action="store_true", help="Always re-read the input files")
+    frontier.add_argument("--sanitize", action="store_true",
+                          help="Replace non-word characters in class names with underscores")
+    frontier.add_argument("--out", help="Output folder (default: next to the student file)")
+    frontier.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    frontier.set_defaults(run=frontier_command)
+
+    serve = commands.add_parser("serve", help="Serve POST /optimize on localhost for index.html.")
+    serve.add_argument("--port", type=int, default=5000, help="Port on 127.0.0.1 (default: %(default)s)")
+    serve.add_argument("--workers", type=int, default=2, help="Warm solver processes (default: %(default)s)")
+    serve.add_argument("--queue", type=int, default=32, help="Jobs waiting before requests get 503 (default: %(default)s)")
+    serve.add_argument("--time-limit", type=float, default=30.0,
+                       help="Seconds per request, and the most a request may ask for (default: %(default)s)")
+    serve.add_argument("--no-cache", action="store_true", help="Keep cached results in memory only")
+    serve.set_defaults(run=serve_command)
+
+    watch = commands.add_parser("watch", parents=[solver_options, weight_options],
+                                help="Re-optimize whenever an updated student or class file lands in a folder.")
+    watch.add_argument("directory", help="Folder the form responses are saved to")
+    watch.add_argument("--students", default="student*", help="File name pattern of the student export "
+                                                               "(default: %(default)s; the newest match is used)")
+    watch.add_argument("--classes", default="class*", help="File name pattern of the class sheet (default: %(default)s)")
+    watch.add_argument("--out", help="Published assignment CSV (default: assignments.csv in the folder)")
+    watch.add_argument("--interval", type=float, default=5.0, help="Seconds between checks (default: %(default)s)")
+    watch.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    watch.set_defaults(run=watch_command)
+
+    bench = commands.add_parser("bench", parents=[weight_options],
+                                help="Benchmark every engine on a ladder of synthetic and real instances.")
+    bench.add_argument("--sizes", nargs="*", default=["200x20", "1000x50", "5000x200", "20000x600"],
+                       help="Synthetic instances as STUDENTSxCLASSES (default: %(default)s)")
+    bench.add_argument("--engines", nargs="+", choices=ENGINES + ("greedy",), default=list(ENGINES) + ["greedy"])
+    bench.add_argument("--manifest", help="Real instances as a batch manifest (default: the FINALPRODUCT workbooks)")
+    bench.add_argument("--no-real", action="store_true", help="Synthetic instances only")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--time-limit", type=float, help="Seconds per solver call (cbc and highs)")
+    bench.add_argument("--timeout", type=float, default=300.0, help="Seconds per run (default: %(default)s)")
+    bench.add_argument("--out", default="bench_results", help="Output folder (default: %(default)s)")
+    bench.add_argument("--baseline", help="Earlier results.json/.csv to check for regressions")
+    bench.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    bench.set_defaults(run=bench_command)
+
+    corpus = commands.add_parser("corpus", help="Check every engine and fast path against the golden optima.")
+    corpus.add_argument("--record", action="store_true",
+                        help="Solve every case and write the corpus instead (all variants must agree)")
+    corpus.add_argument("--corpus", help="Corpus file (default: FINALPRODUCT/corpus.json)")
+    corpus.add_argument("--cases", nargs="+", help="Only these cases")
+    corpus.add_argument("--variants", nargs="+", help='Only these variants, e.g. "cbc mip" flow')
+    corpus.add_argument("--max-slowdown", type=float,
+                        help="Also fail when a variant is this many times slower than recorded")
+    corpus.add_argument("--verbosity", choices=VERBOSITY, default="summary")
+    corpus.set_defaults(run=corpus_command)
+
+    generate = commands.add_parser("generate", help="Write a seeded synthetic instance for load testing.")
+    generate.add_argument("out", help="Output folder")
+    generate.add_argument("--students", type=int, default=1000, help="(default: %(default)s)")
+    generate.add_argument("--classes", type=int, default=50, help="Classes or sections (default: %(default)s)")
+    generate.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    generate.add_argument("--ranks", type=int, default=5, help="Ranked classes per student (default: %(default)s)")
+    generate.add_argument("--skew", type=float, default=1.0,
+                          help="Popularity skew, 0 for uniform (default: %(default)s)")
+    generate.add_argument("--density", type=float, default=0.3,
+                          help="Chance an unranked class is marked available (default: %(default)s)")
+    generate.add_argument("--slack", type=float, default=1.1, help="Seats per student (default: %(default)s)")
+    generate.add_argument("--departments", type=int, default=1, help="(default: %(default)s)")
+    generate.add_argument("--clustering", type=float, default=0.8,
+                          help="Share of ranking weight on a student's own department (default: %(default)s)")
+    generate.add_argument("--formats", nargs="+", choices=("xlsx", "csv", "parquet", "feather", "grid"),
+                          default=["xlsx"], help="(default: xlsx, the layout SpreadIMPORT4 reads)")
+    generate.set_defaults(run=generate_command)
+
+    check = commands.add_parser("check-startup", help="Fail if importing the CLI is slow or pulls in heavy modules.")
+    check.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="Seconds (default: %(default)s)")
+    check.add_argument("--module", default="classoptimizer.cli")
+    check.set_defaults(run=check_startup_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
@@ -0,0 +1,109 @@
+"""Connected-component decomposition of the student/class availability graph.
+
+Students only compete with students who can take one of the same classes,
+so every connected component of the bipartite feasibility graph is an
+independent assignment problem. Components are packed into batches (a batch
+of several components is still a valid sub-grid) and the batches are solved
+across a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from .solution import Solution
+
+
+def component_labels(grid):
+    """Component id of every student and every class."""
+    num_students, num_classes = grid.shape
+    student, cls = np.nonzero(grid.feasible())
+    size = num_students + num_classes
+    graph = coo_matrix((np.ones(len(student), dtype=np.int8), (student, num_students + cls)), shape=(size, size))
+    _, labels = connected_components(graph, directed=False)
+    return labels[:num_students], labels[num_students:]
+
+
+def batches(grid, min_edges=5000):
+    """Groups the components that hold students into (students, classes) batches.
+
+    Components with at least `min_edges` feasible pairs get a batch of their
+    own; smaller ones are packed together until a batch reaches that size.
+    Students without a feasible class are in no batch.
+    """
+    student_labels, class_labels = component_labels(grid)
+    degree = grid.feasible().sum(axis=1)
+    edges = np.bincount(student_labels, weights=degree)
+    labels = np.unique(student_labels[degree > 0])
+    labels = labels[np.argsort(-edges[labels], kind="stable")]
+
+    groups, current, size = [], [], 0
+    for label in labels.tolist():
+        current.append(label)
+        size += edges[label]
+        if size >= min_edges:
+            groups.append(current)
+            current, size = [], 0
+    if current:
+        groups.append(current)
+    return [
+        (np.flatnonzero(np.isin(student_labels, group)), np.flatnonzero(np.isin(class_labels, group)))
+        for group in groups
+    ]
+
+
+def _solve_batch(job):
+    """Process-pool entry point; returns only what is needed to merge."""
+    from .engines import _solve
+
+    grid, engine, max_dissatisfaction, weight_fill, solver, mode, compress, time_limit, warm_start = job
+    solution = _solve(grid, engine, max_dissatisfaction, weight_fill, solver, mode, compress, time_limit, warm_start)
+    return solution.assigned, solution.status, solution.path
+
+
+def _local_classes(assigned, students, classes, num_classes):
+    """`assigned` (global class per student) for one batch, in the batch's class numbering."""
+    local = np.full(num_classes + 1, -1, dtype=np.int64)  # The extra slot maps -1 to -1
+    local[classes] = np.arange(len(classes))
+    return local[np.asarray(assigned)[students]]
+
+
+def solve_components(grid, engine="cbc", max_dissatisfaction=10, weight_fill=50, solver=None, mode="auto",
+                     workers=None, compress=False, min_edges=5000, time_limit=None, warm_start=None):
+    """Solves each batch of components separately and merges the results.
+
+    `workers` is passed to ProcessPoolExecutor (None uses every core); a
+    single batch, or `workers=1`, is solved in this process. Students with
+    no feasible class are never sent to a solver: they stay unassigned and
+    make the status Infeasible, as the full model would. `warm_start` is
+    split up the same way, each batch getting its students' classes.
+    """
+    parts = batches(grid, min_edges)
+    jobs = [
+        (grid.take(students, classes), engine, max_dissatisfaction, weight_fill, solver, mode, compress, time_limit,
+         None if warm_start is None else _local_classes(warm_start, students, classes, grid.shape[1]))
+        for students, classes in parts
+    ]
+    if len(jobs) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_batch, jobs))
+    else:
+        results = [_solve_batch(job) for job in jobs]
+
+    assigned = np.full(len(grid.students), -1, dtype=np.int64)
+    statuses, paths = [], []
+    for (students, classes), (sub_assigned, status, path) in zip(parts, results):
+        placed = sub_assigned >= 0
+        assigned[students[placed]] = classes[sub_assigned[placed]]
+        statuses.append(status)
+        if path and path not in paths:
+            paths.append(path)
+
+    if sum(len(students) for students, _ in parts) < len(grid.students):
+        statuses.append("Infeasible")
+    status = next((s for s in statuses if s != "Optimal"), "Optimal")
+    path = "; ".join(paths)
+    if len(parts) > 1:
+        path = f"{len(parts)} component batches" + (f": {path}" if path else "")
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=status, engine=engine, path=path)
@@ -0,0 +1,124 @@
+"""Equivalence-class compression of identical students and identical sections.
+
+Students with the same cost row (same ranks and availability over every
+class) are interchangeable, and so are classes with the same cost column
+over the resulting profiles. Both are merged into groups: the reduced model
+has one integer per (profile, section group) pair that counts how many of
+the profile's students go there, with the group sizes as row right-hand
+sides and the summed capacities as column limits.
+"""
+import numpy as np
+
+from .solution import Solution
+from .timing import phase
+
+
+class Compression:
+    """Student profiles and section groups of a PreferenceGrid.
+
+    `student_group[i]` / `class_group[j]` give the group of every student
+    and class; `supply` and `capacities` are the group head counts and seat
+    totals the reduced model works with.
+    """
+
+    def __init__(self, grid, max_dissatisfaction):
+        self.grid = grid
+        # 0 marks an infeasible pair; feasible costs are at least 1
+        key = np.where(grid.feasible(), grid.costs(max_dissatisfaction), 0)
+        profiles, self.student_group, self.supply = np.unique(key, axis=0, return_inverse=True, return_counts=True)
+        columns, self.class_group = np.unique(profiles.T, axis=0, return_inverse=True)
+        self.student_group = self.student_group.ravel()
+        self.class_group = self.class_group.ravel()
+        self.capacities = np.bincount(self.class_group, weights=grid.capacities, minlength=len(columns)).astype(np.int64)
+        self.profiles = columns.T
+
+    def merges_nothing(self):
+        """True when every student and every class is a group of its own."""
+        return self.profiles.shape == self.grid.shape
+
+    def edges(self):
+        """Feasible (profile, section group) pairs as FeasibleEdges."""
+        from .model import FeasibleEdges
+
+        student, cls = np.nonzero(self.profiles)
+        return FeasibleEdges(student, cls, self.profiles[student, cls], *self.profiles.shape)
+
+    def describe(self, edges):
+        num_students, num_classes = self.grid.shape
+        num_profiles, num_groups = self.profiles.shape
+        return (f"compressed {num_students}x{num_classes} -> {num_profiles}x{num_groups}, "
+                f"{int(self.grid.feasible().sum())} -> {len(edges)} pairs")
+
+    def expand(self, edges, amounts):
+        """Turns per-group amounts into one class per student, deterministically.
+
+        Students of a profile are handed out in grid order, and the seats
+        of a section group are filled class by class in grid order.
+        """
+        members = _members(self.student_group, len(self.supply))
+        seats = [
+            np.repeat(classes, self.grid.capacities[classes])
+            for classes in _members(self.class_group, len(self.capacities))
+        ]
+        taken_students = np.zeros(len(self.supply), dtype=np.int64)
+        taken_seats = np.zeros(len(self.capacities), dtype=np.int64)
+        assigned = np.full(len(self.grid.students), -1, dtype=np.int64)
+        for g, k, amount in zip(edges.student.tolist(), edges.cls.tolist(), amounts.tolist()):
+            # Amounts from a failed solve need not fit; never hand out more than exists
+            amount = min(amount, len(members[g]) - taken_students[g], len(seats[k]) - taken_seats[k])
+            if amount <= 0:
+                continue
+            students = members[g][taken_students[g]:taken_students[g] + amount]
+            assigned[students] = seats[k][taken_seats[k]:taken_seats[k] + amount]
+            taken_students[g] += amount
+            taken_seats[k] += amount
+        return assigned
+
+    def amounts(self, edges, assigned):
+        """Per-group amounts of a full assignment: the inverse of `expand`."""
+        assigned = np.asarray(assigned, dtype=np.int64)
+        placed = np.flatnonzero(assigned >= 0)
+        num_groups = len(self.capacities)
+        pairs = self.student_group[placed] * num_groups + self.class_group[assigned[placed]]
+        counts = np.bincount(pairs, minlength=len(self.supply) * num_groups)
+        return counts[edges.student * num_groups + edges.cls]
+
+
+def _members(groups, size):
+    """Positions belonging to each group, in ascending order."""
+    order = np.argsort(groups, kind="stable")
+    return np.split(order, np.searchsorted(groups[order], np.arange(1, size)))
+
+
+def solve_compressed(grid, engine="highs", max_dissatisfaction=10, weight_fill=50, solver=None, mode="auto",
+                     time_limit=None, warm_start=None):
+    """Solves the compressed model with "cbc" or "highs" and expands it back.
+
+    A grid without identical students or sections is solved as it is.
+    """
+    with phase("compress") as counts:
+        compression = Compression(grid, max_dissatisfaction)
+        counts.update(profiles=len(compression.supply), groups=len(compression.capacities))
+        edges = None if compression.merges_nothing() else compression.edges()
+    if edges is None:
+        if engine == "cbc":
+            from .engines import solve_cbc
+            solution = solve_cbc(grid, max_dissatisfaction, weight_fill, solver, mode, warm_start)
+        else:
+            from .highs import solve_highs
+            solution = solve_highs(grid, max_dissatisfaction, weight_fill, time_limit, mode)
+        solution.path = "nothing to compress, " + solution.path
+        return solution
+    if engine == "cbc":
+        from .engines import solve_cbc_edges
+        initial = None if warm_start is None else compression.amounts(edges, warm_start)
+        amounts, status, path = solve_cbc_edges(edges, compression.capacities, weight_fill, solver, mode,
+                                                compression.supply, initial=initial)
+    else:
+        from .highs import solve_highs_edges
+        amounts, status, path = solve_highs_edges(edges, compression.capacities, weight_fill, compression.supply,
+                                                   time_limit, mode)
+    with phase("extract", students=len(grid.students)):
+        assigned = compression.expand(edges, amounts)
+    path = compression.describe(edges) + ", " + path
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=status, engine=engine, path=path)
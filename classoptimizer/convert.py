@@ -0,0 +1,57 @@
+"""One-shot conversion of Excel sheets into CSV, Parquet and Feather.
+
+    python -m classoptimizer.convert                  # every FINALPRODUCT/*.xlsx
+    python -m classoptimizer.convert a.xlsx b.xlsx --formats csv
+
+Each sheet is written next to the original with the same name and headers,
+so the converted files can be picked in the file dialogs instead.
+"""
+import argparse
+import glob
+import importlib.util
+import os
+
+import pandas as pd
+
+FORMATS = ("csv", "parquet", "feather")
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "FINALPRODUCT", "*.xlsx")
+
+
+def convert(path, formats=FORMATS):
+    """Writes `path` in each of `formats`; returns the files written."""
+    df = pd.read_excel(path)
+    # Free-text columns can mix numbers and strings, which Parquet/Feather reject
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+
+    base = os.path.splitext(path)[0]
+    written = []
+    for fmt in formats:
+        target = f"{base}.{fmt}"
+        if fmt == "csv":
+            df.to_csv(target, index=False)
+        elif fmt == "parquet":
+            df.to_parquet(target, index=False)
+        else:
+            df.to_feather(target)
+        written.append(target)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert schedule spreadsheets to CSV/Parquet/Feather.")
+    parser.add_argument("files", nargs="*", help="Excel files to convert (default: FINALPRODUCT/*.xlsx)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args(argv)
+
+    formats = args.formats
+    if importlib.util.find_spec("pyarrow") is None and {"parquet", "feather"} & set(formats):
+        print("pyarrow is not installed; skipping Parquet/Feather output.")
+        formats = [fmt for fmt in formats if fmt == "csv"]
+    for path in args.files or sorted(glob.glob(FIXTURES)):
+        for target in convert(path, formats):
+            print(f"{path} -> {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Golden corpus: proven optimal objectives that every engine and fast path must reproduce.
+
+    python -m classoptimizer corpus --record     # after an intentional change to the instances
+    python -m classoptimizer corpus              # check every engine and variant against it
+
+The corpus is the FINALPRODUCT workbooks, the fully specified fruit
+instance of FruitOptimize02.py (read from the script itself), the seeded
+random instance of Optimize.py (rebuilt by replaying its `random` calls,
+leftover penalty 20) and two synthetic instances, one of them split into
+separate departments with many students sharing a preference profile (so
+compression and the component pool have work to do). For each case it stores
+a hash of the instance, the optimal objective, rank total and unfilled
+seats, and the solve time of every variant.
+
+Checking solves every case with every variant: each engine on its default
+path and with each optimization switched off or forced (MIP instead of the
+LP shortcut, no compression, no presolve, the component process pool, a
+CBC MIP start, a side constraint sending the LP shortcut to the MIP, the
+compiled instance round trip). A variant fails when it is not optimal,
+when its objective differs from the golden one, when its schedule is
+invalid (an unavailable class or an over-full class) or when its path
+shows it did not take the route it is there to test. A
+different unfilled total at the same objective is an alternative optimum
+and only noted; slower solves are reported, and fail with `max_slowdown`.
+"""
+import ast
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import time
+
+import numpy as np
+
+from .bench import FIXTURE_DIR
+
+CORPUS_PATH = os.path.join(FIXTURE_DIR, "corpus.json")
+SCRIPTS_DIR = os.path.dirname(FIXTURE_DIR)
+CORPUS_VERSION = 1
+# Slowdowns smaller than this many seconds are noise
+MIN_SECONDS = 0.25
+
+
+def _script_values(path, names):
+    """Literal top-level assignments of a script, read without running it."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name) \
+                and node.targets[0].id in names:
+            values[node.targets[0].id] = ast.literal_eval(node.value)
+    missing = set(names) - set(values)
+    if missing:
+        raise ValueError(f"{path} no longer assigns {', '.join(sorted(missing))} literally")
+    return values
+
+
+def _fruit_grid(fruits, quantities, top_5_rankings, allergies):
+    """Fruit scripts' data as a PreferenceGrid: ranked fruits, then every fruit the person is not allergic to."""
+    from .grid import PreferenceGrid
+
+    available = {person: [f for f in fruits if f not in top_5 and not allergies[person].get(f, False)]
+                 for person, top_5 in top_5_rankings.items()}
+    return PreferenceGrid.from_dicts({f: quantities.get(f, 0) for f in fruits}, top_5_rankings, available)
+
+
+def fruit_instance():
+    """FruitOptimize02.py's fixed instance."""
+    values = _script_values(os.path.join(SCRIPTS_DIR, "FruitOptimize02.py"),
+                            ("fruits", "fruit_quantities", "top_5_rankings", "allergies"))
+    return _fruit_grid(values["fruits"], values["fruit_quantities"], values["top_5_rankings"], values["allergies"])
+
+
+def random_fruit_instance():
+    """Optimize.py's instance, from the same seed and sequence of `random` calls."""
+    values = _script_values(os.path.join(SCRIPTS_DIR, "Optimize.py"), ("people", "fruits"))
+    people, fruits = values["people"], values["fruits"]
+    rng = random.Random(42)
+    top_5_rankings = {person: rng.sample(fruits, 5) for person in people}
+    allergies = {person: {fruit: rng.choice([True, False]) for fruit in fruits} for person in people}
+    popularity_weights = {fruit: rng.randint(1, 10) for fruit in fruits}
+    quantities = {fruit: 0 for fruit in fruits}
+    for fruit in rng.choices(list(popularity_weights), weights=popularity_weights.values(), k=len(people)):
+        quantities[fruit] += 1
+    return _fruit_grid(fruits, quantities, top_5_rankings, allergies)
+
+
+def _workbooks(students, classes):
+    def load():
+        from .instance import read_grid
+
+        return read_grid(os.path.join(FIXTURE_DIR, students), os.path.join(FIXTURE_DIR, classes))
+    return load
+
+
+def _synthetic():
+    from .generate import generate
+
+    return generate(400, 25, seed=7, departments=3, density=0.15)
+
+
+def _departments():
+    from .generate import generate
+
+    return generate(600, 24, seed=3, ranks=3, slack=1.3, departments=4, clustering=1.0, density=0.0)
+
+
+# name -> (grid loader, max_dissatisfaction, weight_fill)
+CASES = {
+    "student_rankings": (_workbooks("student_rankings.xlsx", "class_spots.xlsx"), 10, 50),
+    "student_rankings_no_fill": (_workbooks("student_rankings.xlsx", "class_spots.xlsx"), 10, 0),
+    "student_preferences": (_workbooks("student_preferences.xlsx", "class_spots_fixed.xlsx"), 10, 50),
+    "student_preferences_no_fill": (_workbooks("student_preferences.xlsx", "class_spots_fixed.xlsx"), 10, 0),
+    "fruit_fixed": (fruit_instance, 10, 50),
+    "fruit_random": (random_fruit_instance, 10, 20),
+    "synthetic_400x25": (_synthetic, 10, 50),
+    "departments_600x24": (_departments, 10, 50),
+}
+
+# label -> (engine, engines.solve keywords); "instance" solves a save/load round trip of the grid and
+# "side_constraint" solves the full grid with a redundant seat cap across all classes
+VARIANTS = {
+    "cbc": ("cbc", {}),
+    "cbc mip": ("cbc", {"mode": "mip"}),
+    "cbc uncompressed": ("cbc", {"compress": False}),
+    "cbc no presolve": ("cbc", {"presolve": False, "compress": False}),
+    "cbc components": ("cbc", {"workers": 2, "min_edges": 1}),
+    "cbc warm start": ("cbc", {"warm_start": "greedy", "mode": "mip"}),
+    "cbc side constraint": ("cbc", {"side_constraint": True}),
+    "highs": ("highs", {}),
+    "highs mip": ("highs", {"mode": "mip"}),
+    "highs uncompressed": ("highs", {"compress": False}),
+    "highs no presolve": ("highs", {"presolve": False, "compress": False}),
+    "highs components": ("highs", {"workers": 2, "min_edges": 1}),
+    "flow": ("flow", {}),
+    "flow no presolve": ("flow", {"presolve": False}),
+    "flow components": ("flow", {"workers": 2, "min_edges": 1}),
+    "flow instance": ("flow", {"instance": True}),
+    "scipy": ("scipy", {}),
+    "scipy no presolve": ("scipy", {"presolve": False}),
+}
+
+# label -> pattern its Solution.path must match on every case; ROUTES_BY_CASE adds the routes only some
+# instances can take (a grid with nothing to merge is not compressed, one component is one batch)
+ROUTES = {
+    "cbc": r", lp$",
+    "cbc mip": r"(^|, )mip$",
+    "cbc uncompressed": r"^lp$",
+    "cbc no presolve": r"^lp$",
+    "cbc warm start": r"(^|, )warm-started mip$",
+    "cbc side constraint": r"^side constraints -> mip$",
+    "highs": r", lp$",
+    "highs mip": r"(^|, )mip$",
+    "highs uncompressed": r"^lp$",
+    "highs no presolve": r"^lp$",
+}
+ROUTES_BY_CASE = {
+    "departments_600x24": {
+        "cbc": r"^compressed .*, lp$",
+        "cbc components": r"^4 component batches: compressed ",
+        "highs": r"^compressed .*, lp$",
+        "highs components": r"^4 component batches: compressed ",
+        "flow components": r"^4 component batches$",
+    },
+}
+
+
+def instance_digest(grid):
+    """SHA-256 of the names, capacities, ranks and availability."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(s) for s in grid.students], [str(c) for c in grid.classes]]).encode("utf-8"))
+    digest.update(np.ascontiguousarray(grid.capacities, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(grid.rank, dtype=np.int64).tobytes())
+    digest.update(np.packbits(np.asarray(grid.available, dtype=bool), axis=None).tobytes())
+    return digest.hexdigest()
+
+
+def route_problems(name, label, solution):
+    """The routes `label` should have taken on case `name` that `solution.path` does not show."""
+    patterns = [ROUTES.get(label), ROUTES_BY_CASE.get(name, {}).get(label)]
+    return [f"path {solution.path!r} does not match {pattern!r}" for pattern in patterns
+            if pattern is not None and not re.search(pattern, solution.path)]
+
+
+def problems(solution):
+    """What makes a schedule invalid, independently of the engine that produced it."""
+    grid, assigned = solution.grid, solution.assigned
+    placed = np.flatnonzero(assigned >= 0)
+    found = []
+    infeasible = placed[~grid.feasible()[placed, assigned[placed]]]
+    if len(infeasible):
+        found.append(f"{len(infeasible)} students in classes they cannot take, e.g. {grid.students[infeasible[0]]}")
+    fill = np.bincount(assigned[placed], minlength=len(grid.classes))
+    over = np.flatnonzero(fill > grid.capacities)
+    if len(over):
+        found.append(f"{len(over)} classes over capacity, e.g. {grid.classes[over[0]]}")
+    return found
+
+
+def run_variant(grid, label, max_dissatisfaction, weight_fill):
+    """Solves one case with one variant; returns (solution, seconds)."""
+    engine, options = VARIANTS[label]
+    options = dict(options)
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        if options.pop("instance", False):
+            from .instance import load_instance, save_instance
+
+            path = os.path.join(directory, "case.grid")
+            save_instance(grid, path)
+            grid = load_instance(path)
+        return _solve_variant(grid, engine, options, max_dissatisfaction, weight_fill)
+
+
+def _solve_variant(grid, engine, options, max_dissatisfaction, weight_fill):
+    from .bench import solve_greedy
+    from .engines import solve
+
+    if options.get("warm_start") == "greedy":
+        from pulp import PULP_CBC_CMD
+
+        options["warm_start"] = solve_greedy(grid, max_dissatisfaction, weight_fill).assigned
+        options["solver"] = PULP_CBC_CMD(msg=False, warmStart=True)
+    elif engine == "cbc":
+        from pulp import PULP_CBC_CMD
+
+        options["solver"] = PULP_CBC_CMD(msg=False)
+    start = time.perf_counter()
+    if options.pop("side_constraint", False):
+        from .engines import solve_cbc
+
+        solution = solve_cbc(grid, max_dissatisfaction, weight_fill, constrain=_seat_cap(grid), **options)
+    else:
+        solution = solve(grid, engine, max_dissatisfaction, weight_fill, **options)
+    return solution, time.perf_counter() - start
+
+
+def _seat_cap(grid):
+    """A side constraint every schedule meets: no more students placed than there are students."""
+    def constrain(problem, x):
+        from pulp import lpSum
+
+        problem += lpSum(x) <= len(grid.students), "seat_cap"
+    return constrain
+
+
+def _import_engines():
+    """Imports every engine up front, so the first variant's time is not import time."""
+    import pulp  # noqa: F401
+
+    from . import compress, engines, flow, highs, presolve, transport  # noqa: F401
+
+
+def summary(solution):
+    return {"objective": float(solution.total_dissatisfaction), "total_rank": int(solution.total_rank),
+            "unfilled_seats": int(solution.unfilled().sum()), "unassigned": len(solution.unassigned())}
+
+
+def record(path=CORPUS_PATH, cases=None, variants=None, report=None):
+    """Solves every case with every variant and writes the corpus.
+
+    Refuses (ValueError) when a variant is not optimal, returns an invalid
+    schedule, misses its route or disagrees with the others on the
+    objective: there is then no proven optimum to record.
+    """
+    _import_engines()
+    corpus = {"version": CORPUS_VERSION, "cases": {}}
+    for name in cases or CASES:
+        load, max_dissatisfaction, weight_fill = CASES[name]
+        grid = load()
+        entry = {"instance": instance_digest(grid), "students": len(grid.students), "classes": len(grid.classes),
+                 "max_dissatisfaction": max_dissatisfaction, "weight_fill": weight_fill, "seconds": {}}
+        for label in variants or VARIANTS:
+            solution, seconds = run_variant(grid, label, max_dissatisfaction, weight_fill)
+            found = problems(solution) + route_problems(name, label, solution)
+            if solution.status != "Optimal":
+                found.append(f"status {solution.status}")
+            if found:
+                raise ValueError(f"{name} / {label}: {'; '.join(found)}")
+            result = summary(solution)
+            if "objective" not in entry:
+                entry.update(result)
+            elif abs(result["objective"] - entry["objective"]) > 1e-6:
+                raise ValueError(f"{name}: {label} finds objective {result['objective']}, "
+                                 f"earlier variants {entry['objective']}")
+            entry["seconds"][label] = round(seconds, 4)
+        corpus["cases"][name] = entry
+        if report is not None:
+            report.summary(f"📌 {name}: objective {entry['objective']}, {entry['unfilled_seats']} unfilled seats, "
+                           f"{entry['unassigned']} unassigned")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(temp, path)
+    return corpus
+
+
+def check(path=CORPUS_PATH, cases=None, variants=None, max_slowdown=None, report=None):
+    """Checks every case and variant against the corpus; returns (failures, notes) as text lines."""
+    with open(path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    if corpus.get("version") != CORPUS_VERSION:
+        return [f"{path} has corpus version {corpus.get('version')}, expected {CORPUS_VERSION}; re-record it"], []
+    _import_engines()
+    failures, notes = [], []
+    for name in cases or CASES:
+        golden = corpus["cases"].get(name)
+        if golden is None:
+            failures.append(f"{name}: not in {path}; re-record it")
+            continue
+        load, max_dissatisfaction, weight_fill = CASES[name]
+        grid = load()
+        if instance_digest(grid) != golden["instance"]:
+            failures.append(f"{name}: the instance changed since it was recorded; re-record it")
+            continue
+        for label in variants or VARIANTS:
+            where = f"{name} / {label}"
+            try:
+                solution, seconds = run_variant(grid, label, max_dissatisfaction, weight_fill)
+            except Exception as exc:
+                failures.append(f"{where}: {type(exc).__name__}: {exc}")
+                continue
+            found = problems(solution) + route_problems(name, label, solution)
+            result = summary(solution)
+            if solution.status != "Optimal":
+                found.append(f"status {solution.status}")
+            if abs(result["objective"] - golden["objective"]) > 1e-6:
+                found.append(f"objective {result['objective']:g}, golden {golden['objective']:g}")
+            failures += [f"{where}: {problem}" for problem in found]
+            if not found and result["unfilled_seats"] != golden["unfilled_seats"]:
+                notes.append(f"{where}: alternative optimum with {result['unfilled_seats']} unfilled seats "
+                             f"(golden {golden['unfilled_seats']})")
+            recorded = golden["seconds"].get(label)
+            if recorded is not None and seconds - recorded > MIN_SECONDS and max_slowdown is not None \
+                    and seconds > recorded * max_slowdown:
+                failures.append(f"{where}: {seconds:.3f}s, recorded {recorded:.3f}s")
+            elif recorded is not None and seconds - recorded > MIN_SECONDS and seconds > recorded * 2:
+                notes.append(f"{where}: {seconds:.3f}s, recorded {recorded:.3f}s")
+            if report is not None:
+                report.detail(f"{'❌' if found else '✅'} {where}: {result['objective']:g} in {seconds:.3f}s")
+        if report is not None:
+            report.summary(f"{'❌' if any(line.startswith(name + ' /') for line in failures) else '✅'} {name}")
+    return failures, notes
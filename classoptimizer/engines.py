@@ -0,0 +1,164 @@
+"""Engine selection for optimize_schedule."""
+import numpy as np
+
+from .solution import Solution, edge_amounts, is_integral
+from .timing import phase
+
+ENGINES = ("cbc", "highs", "flow", "scipy")
+
+# Solve modes: "auto" tries the LP relaxation first, "mip" always branches
+MODES = ("auto", "mip")
+
+
+def solve_cbc_edges(edges, capacities, weight_fill, solver=None, mode="auto", supply=None, tol=1e-6, initial=None,
+                    constrain=None):
+    """Solves the PuLP model over `edges`; returns (amount per edge, status, path).
+
+    In "auto" mode a model with only the network rows is solved as an LP;
+    the MIP is solved only when a side constraint breaks that structure or
+    the LP comes back fractional. The path says which one ran. `initial`
+    (an amount per edge) is set as the variables' starting values; CBC
+    uses it as a MIP start when `solver` was created with warmStart=True.
+    An LP has no use for a MIP start, so with `initial` the MIP is solved
+    directly in either mode. `constrain(problem, x)` may add side
+    constraints (a pinned pair, a cap across classes...) before the solve.
+    The status is "Optimal" only for a proven optimum: a solve stopped on
+    its time limit keeps its best integer solution as "Not Solved" (as
+    HiGHS reports it), and without any solution every amount is 0.
+    """
+    from pulp import LpSolutionIntegerFeasible, LpSolutionOptimal, LpStatus
+
+    from .model import build_sparse_model, is_network_model, set_integer
+
+    relaxed = mode == "auto" and initial is None
+    problem, x, unfilled_penalty = build_sparse_model(edges, capacities, weight_fill, relaxed=relaxed, supply=supply)
+    if constrain is not None:
+        constrain(problem, x)
+    if initial is not None:
+        initial = np.asarray(initial, dtype=np.int64)
+        fill = np.bincount(edges.cls, weights=initial, minlength=len(capacities))
+        for var, value in zip(x, initial.tolist()):
+            var.setInitialValue(value)
+        for var, value in zip(unfilled_penalty, np.maximum(np.asarray(capacities) - fill, 0).tolist()):
+            var.setInitialValue(value)
+    path = "mip" if initial is None else "warm-started mip"
+    if relaxed:
+        if is_network_model(problem):
+            with phase("solver", engine="cbc", model="lp"):
+                problem.solve(solver)
+                path = "lp" if LpStatus[problem.status] != "Optimal" or is_integral(_values(x), tol) else "lp, fractional -> mip"
+        else:
+            path = "side constraints -> mip"
+        if path != "lp":
+            set_integer(x)
+    if path != "lp":
+        with phase("solver", engine="cbc", model="mip"):
+            problem.solve(solver)
+
+    status = LpStatus[problem.status]
+    # PuLP maps CBC's "Stopped on time" with an incumbent to Optimal; only sol_status tells them apart
+    if status == "Optimal" and problem.sol_status != LpSolutionOptimal:
+        status = "Not Solved"
+    with phase("extract", variables=len(x)):
+        if problem.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+            # Values left over from an infeasible or unfinished solve need not respect the capacities
+            return np.zeros(len(x), dtype=np.int64), status, path
+        return edge_amounts(_values(x), tol), status, path
+
+
+def _values(x):
+    """Solver values of the edge variables as one float array (unset values read as 0)."""
+    return np.fromiter((var.varValue or 0 for var in x), dtype=np.float64, count=len(x))
+
+
+def solve_cbc(grid, max_dissatisfaction=10, weight_fill=50, solver=None, mode="auto", warm_start=None,
+              constrain=None):
+    """Solves the sparse PuLP model with CBC (or the given PuLP solver); see solve_cbc_edges."""
+    edges = grid.feasible_edges(max_dissatisfaction)
+    initial = None
+    if warm_start is not None:
+        initial = (np.asarray(warm_start)[edges.student] == edges.cls).astype(np.int64)
+    amounts, status, path = solve_cbc_edges(edges, grid.capacities, weight_fill, solver, mode, initial=initial,
+                                            constrain=constrain)
+    assigned = np.full(len(grid.students), -1, dtype=np.int64)
+    chosen = amounts > 0
+    assigned[edges.student[chosen]] = edges.cls[chosen]
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=status, engine="cbc", path=path)
+
+
+def solve(grid, engine="cbc", max_dissatisfaction=10, weight_fill=50, solver=None, mode="auto", presolve=True,
+          workers=1, compress=True, time_limit=None, warm_start=None, min_edges=5000):
+    """Runs the named engine on a PreferenceGrid and returns its Solution.
+
+    `mode` applies to the LP/MIP engines ("cbc" and "highs"). With
+    `presolve` the engine only sees the grid left after fixing forced
+    assignments and dropping dead classes and students; the Solution is
+    mapped back to the full grid and keeps the Presolve in `.presolve`.
+    Any `workers` other than 1 splits the grid into connected components
+    and solves them across a process pool (None uses every core), packed
+    into batches of at least `min_edges` feasible pairs; callers must then
+    run under an `if __name__ == "__main__":` guard. With
+    `compress` the "cbc" and "highs" engines merge identical students and
+    identical sections and solve one integer per group pair (a grid with
+    nothing to merge is solved as it is). `time_limit`
+    (seconds) caps each HiGHS solve, and each CBC solve when no `solver`
+    is given; "flow" and "scipy" ignore it. `warm_start` is a previous
+    `Solution.assigned` for the same grid (-1 for no class). Only the
+    "cbc" engine uses it: it passes it on as a MIP start (use a solver
+    created with warmStart=True) and so solves the MIP even in "auto"
+    mode. "highs", "flow" and "scipy" ignore it.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {', '.join(MODES)}")
+    if engine == "cbc" and solver is None and time_limit is not None:
+        from pulp import PULP_CBC_CMD
+
+        solver = PULP_CBC_CMD(msg=False, timeLimit=time_limit)
+    if workers != 1:
+        from .components import solve_components
+
+        def run(grid):
+            return solve_components(grid, engine, max_dissatisfaction, weight_fill, solver, mode, workers, compress,
+                                    min_edges, time_limit, warm_start)
+    else:
+        def run(grid):
+            return _solve(grid, engine, max_dissatisfaction, weight_fill, solver, mode, compress, time_limit,
+                          warm_start)
+
+    if not presolve:
+        return run(grid)
+
+    from .presolve import Presolve
+
+    with phase("presolve") as counts:
+        reduction = Presolve(grid, max_dissatisfaction)
+        counts.update(students=len(reduction.students), classes=len(reduction.classes))
+    if warm_start is not None:
+        warm_start = reduction.reduce(warm_start)
+    if len(reduction.students):
+        solution = run(reduction.grid)
+    else:
+        solution = Solution(reduction.grid, [], max_dissatisfaction, weight_fill, engine=engine, path="presolve")
+    return reduction.expand(solution)
+
+
+def _solve(grid, engine, max_dissatisfaction, weight_fill, solver, mode, compress=False, time_limit=None,
+           warm_start=None):
+    if compress and engine in ("cbc", "highs") and all(grid.shape):
+        from .compress import solve_compressed
+        return solve_compressed(grid, engine, max_dissatisfaction, weight_fill, solver, mode, time_limit, warm_start)
+    if engine == "cbc":
+        return solve_cbc(grid, max_dissatisfaction, weight_fill, solver, mode, warm_start)
+    if engine == "highs":
+        from .highs import solve_highs
+        return solve_highs(grid, max_dissatisfaction, weight_fill, time_limit, mode)
+    # Model build, solve and extraction are one phase for the native engines
+    if engine == "flow":
+        from .flow import solve_min_cost_flow
+        with phase("solver", engine="flow"):
+            return solve_min_cost_flow(grid, max_dissatisfaction, weight_fill)
+    from .transport import solve_capacitated_assignment
+    with phase("solver", engine="scipy"):
+        return solve_capacitated_assignment(grid, max_dissatisfaction, weight_fill)
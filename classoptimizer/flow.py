@@ -0,0 +1,260 @@
+"""Native min-cost-flow engine for the student/class transportation problem.
+
+The network is source -> students -> classes -> sink. Every student also has
+a slack arc to an "unassigned" node, priced above any achievable rank total,
+so the flow always saturates the students and leftover students are
+reported instead of making the model infeasible. Unfilled seats are the
+slack between a class's capacity and its inflow; since every student is
+placed, their `weight_fill` penalty is the same for every optimal flow and
+is added back in the Solution totals.
+
+Costs are small integers (ranks 1-5, `max_dissatisfaction`), so the solver
+runs successive shortest paths in primal-dual phases: a Dijkstra over
+reduced costs with a bucket queue (one bucket per integer distance, a heap
+over the few distinct distances in use) finds the next shortest augmenting
+distance, and Dinic-style blocking flows over the zero reduced-cost arcs
+then push every augmenting path of that length before the next Dijkstra.
+
+The time follows the number of feasible pairs more than the number of
+students. For generate(50000, 1000, seed=1) on one Xeon core, pure Python:
+
+    density   feasible pairs    solve
+    0.0          250,000         4.5s  (the 5 ranked classes only)
+    0.02       1,246,180         9.3s
+    0.1        5,223,057        22.3s
+    0.3       15,172,317        54.6s  (generate's default)
+"""
+from heapq import heappop, heappush
+
+import numpy as np
+
+from .solution import Solution
+
+_SINK = -1
+
+
+class _Network:
+    """Residual state of the bipartite network, indexed by position."""
+
+    def __init__(self, adjacency, capacities, unassigned_cost):
+        self.num_students = len(adjacency)
+        self.dump = len(capacities)
+        # The unassigned node is one more class that never fills up
+        self.adjacency = [row + [(self.dump, unassigned_cost)] for row in adjacency]
+        self.capacity = list(capacities) + [self.num_students]
+        self.used = [0] * len(self.capacity)
+        self.members = [set() for _ in self.capacity]
+        self.match = [-1] * self.num_students
+        self.match_cost = [0] * self.num_students
+        self.student_potential = [0] * self.num_students
+        self.class_potential = [0] * len(self.capacity)
+        self.sink_potential = 0
+
+    def free_students(self):
+        return [i for i, j in enumerate(self.match) if j < 0]
+
+    def shortest_distance(self):
+        """Dijkstra from all free students; updates potentials, returns the sink distance."""
+        inf = float("inf")
+        ps, pc = self.student_potential, self.class_potential
+        student_dist = [inf] * self.num_students
+        class_dist = [inf] * len(self.capacity)
+        sink_dist = inf
+        buckets, keys = {}, []
+
+        def push(d, node):
+            bucket = buckets.get(d)
+            if bucket is None:
+                buckets[d] = [node]
+                heappush(keys, d)
+            else:
+                bucket.append(node)
+
+        for i in self.free_students():
+            student_dist[i] = 0
+            push(0, i)
+
+        # Class nodes are encoded as -2 - j so one bucket holds both kinds
+        while keys:
+            d = heappop(keys)
+            bucket = buckets.pop(d)
+            if _SINK in bucket:
+                sink_dist = d
+                break
+            for node in bucket:
+                if node >= 0:
+                    if student_dist[node] != d:
+                        continue
+                    base = d + ps[node]
+                    matched = self.match[node]
+                    for j, cost in self.adjacency[node]:
+                        if j == matched:
+                            continue
+                        nd = base + cost - pc[j]
+                        if nd < class_dist[j]:
+                            class_dist[j] = nd
+                            push(nd, -2 - j)
+                else:
+                    j = -2 - node
+                    if class_dist[j] != d:
+                        continue
+                    base = d + pc[j]
+                    for k in self.members[j]:
+                        nd = base - ps[k] - self.match_cost[k]
+                        if nd < student_dist[k]:
+                            student_dist[k] = nd
+                            push(nd, k)
+                    if self.used[j] < self.capacity[j]:
+                        nd = base - self.sink_potential
+                        if nd < sink_dist:
+                            sink_dist = nd
+                            push(nd, _SINK)
+
+        if sink_dist == inf:
+            return None
+        for i, d in enumerate(student_dist):
+            ps[i] += d if d < sink_dist else sink_dist
+        for j, d in enumerate(class_dist):
+            pc[j] += d if d < sink_dist else sink_dist
+        self.sink_potential += sink_dist
+        return sink_dist
+
+    def _admissible_levels(self):
+        """BFS over zero reduced-cost arcs; returns student/class levels and the sink level."""
+        ps, pc = self.student_potential, self.class_potential
+        student_level = [-1] * self.num_students
+        class_level = [-1] * len(self.capacity)
+        frontier = self.free_students()
+        for i in frontier:
+            student_level[i] = 0
+        level = 0
+        while frontier:
+            reached = []
+            for i in frontier:
+                matched = self.match[i]
+                for j, cost in self.adjacency[i]:
+                    if class_level[j] < 0 and j != matched and cost + ps[i] - pc[j] == 0:
+                        class_level[j] = level + 1
+                        reached.append(j)
+            if any(self.used[j] < self.capacity[j] and pc[j] == self.sink_potential for j in reached):
+                return student_level, class_level, level + 2
+            frontier = []
+            for j in reached:
+                for k in self.members[j]:
+                    if student_level[k] < 0 and pc[j] - ps[k] - self.match_cost[k] == 0:
+                        student_level[k] = level + 2
+                        frontier.append(k)
+            level += 2
+        return student_level, class_level, None
+
+    def blocking_flow(self):
+        """Pushes augmenting paths over zero reduced-cost arcs; returns how many.
+
+        Each round restricts the admissible arcs to a BFS level graph, so a
+        node that fails to reach the sink stays dead for the rest of the round
+        and every round is linear in the admissible arcs.
+        """
+        ps, pc = self.student_potential, self.class_potential
+        augmented = 0
+        while True:
+            student_level, class_level, sink_level = self._admissible_levels()
+            if sink_level is None:
+                return augmented
+            position = [0] * self.num_students
+            queues = {}
+
+            def next_member(j):
+                # Each class hands out the members it had at BFS time once per round
+                queue = queues.get(j)
+                if queue is None:
+                    queue = queues[j] = [list(self.members[j]), 0]
+                members, index = queue
+                wanted = class_level[j] + 1
+                while index < len(members):
+                    k = members[index]
+                    index += 1
+                    if student_level[k] == wanted and self.match[k] == j:
+                        queue[1] = index
+                        return k
+                queue[1] = index
+                return None
+
+            for root in self.free_students():
+                stack, via = [root], []
+                while stack:
+                    i = stack[-1]
+                    row = self.adjacency[i]
+                    wanted = student_level[i] + 1
+                    step = None
+                    while position[i] < len(row):
+                        j, cost = row[position[i]]
+                        if class_level[j] == wanted and j != self.match[i] and cost + ps[i] - pc[j] == 0:
+                            if wanted + 1 == sink_level and self.used[j] < self.capacity[j] and pc[j] == self.sink_potential:
+                                step = (j, None)
+                                break
+                            k = next_member(j) if wanted + 1 < sink_level else None
+                            if k is not None:
+                                step = (j, k)
+                                break
+                        position[i] += 1
+                    if step is None:
+                        # Dead end: nothing below i reaches the sink in this round
+                        student_level[i] = -1
+                        stack.pop()
+                        if via:
+                            via.pop()
+                        continue
+                    j, k = step
+                    if k is None:
+                        self._augment(stack, via + [j])
+                        augmented += 1
+                        for moved in stack:
+                            student_level[moved] = -1
+                        break
+                    via.append(j)
+                    stack.append(k)
+
+    def _augment(self, students, classes):
+        """Moves students[t] into classes[t]; the last class gains one member."""
+        for i, j in zip(students, classes):
+            old = self.match[i]
+            if old >= 0:
+                self.members[old].discard(i)
+                self.used[old] -= 1
+            self.match[i] = j
+            self.match_cost[i] = self._cost(i, j)
+            self.members[j].add(i)
+            self.used[j] += 1
+
+    def _cost(self, i, j):
+        for target, cost in self.adjacency[i]:
+            if target == j:
+                return cost
+        raise KeyError((i, j))
+
+    def solve(self):
+        while self.free_students():
+            if self.shortest_distance() is None or not self.blocking_flow():
+                break
+        return [j if j != self.dump else -1 for j in self.match]
+
+
+def solve_min_cost_flow(grid, max_dissatisfaction=10, weight_fill=50):
+    """Solves the assignment model as a min-cost flow without an external solver.
+
+    Returns a Solution whose objective matches the CBC model's optimum when
+    every student can be placed; otherwise the status is "Infeasible" (as CBC
+    would report) and the students left over are listed as unassigned.
+    """
+    num_students, num_classes = grid.shape
+    edges = grid.feasible_edges(max_dissatisfaction)
+    adjacency = [[] for _ in range(num_students)]
+    for i, j, cost in zip(edges.student.tolist(), edges.cls.tolist(), edges.cost.tolist()):
+        adjacency[i].append((j, cost))
+
+    max_cost = int(edges.cost.max(initial=0))
+    unassigned_cost = max_cost * (num_students + 1) + 1
+    network = _Network(adjacency, grid.capacities.tolist(), unassigned_cost)
+    assigned = np.array(network.solve(), dtype=np.int64)
+    status = "Optimal" if (assigned >= 0).all() else "Infeasible"
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=status, engine="flow")
@@ -0,0 +1,204 @@
+"""Seeded synthetic instances for load and stress testing.
+
+    python -m classoptimizer generate synthetic/ --students 100000 --classes 3000 --departments 40
+
+Classes are split into departments and given Zipf-like popularity
+(`skew` 0 is uniform). Each student belongs to one department and ranks
+`ranks` distinct classes, drawn without replacement in proportion to
+popularity, with `clustering` of the draw weight on their own department
+(a Gumbel top-k over each block of students, so nothing loops per
+student). Every other class is marked available with probability
+`density`. Capacities share `slack` x students seats between the classes,
+partly in proportion to popularity, with at least one seat per class.
+
+Instances are written as `students.<ext>` and `classes.<ext>` in the
+layout of the form export (First Name, Last Name, Rank [X], Available
+[X]) that SpreadIMPORT4 reads, as .xlsx, .csv, .parquet or .feather, or
+as one compiled `.grid` instance (see instance.py) that loads fastest.
+Student rows are produced and written in blocks, so only the grid itself
+has to fit in memory.
+"""
+import math
+import os
+
+import numpy as np
+
+from .grid import PreferenceGrid, rank_dtype
+
+FORMATS = ("xlsx", "csv", "parquet", "feather", "grid")
+BLOCK_CELLS = 1 << 22  # Students x classes sampled or written at once
+
+
+def class_names(num_classes, departments=1):
+    if departments == 1:
+        return [f"Class{j + 1}" for j in range(num_classes)]
+    return [f"D{department + 1}-Class{j + 1}" for j, department in enumerate(class_departments(num_classes, departments))]
+
+
+def class_departments(num_classes, departments=1):
+    """Department of each class: contiguous, near-equal blocks."""
+    return np.arange(num_classes) * departments // max(num_classes, 1)
+
+
+def popularity(num_classes, skew, rng):
+    """Zipf-like weights (1 / position ** skew) over the classes in random order, summing to 1."""
+    weights = 1.0 / np.arange(1, num_classes + 1) ** skew
+    weights = weights[rng.permutation(num_classes)]
+    return weights / weights.sum()
+
+
+def capacities(num_students, weights, slack, rng):
+    """`slack` x students seats over the classes: one each, the rest half by popularity, half uniformly."""
+    num_classes = len(weights)
+    seats = max(math.ceil(slack * num_students), num_classes)
+    shares = 0.5 * weights + 0.5 / num_classes
+    return 1 + rng.multinomial(seats - num_classes, shares / shares.sum())
+
+
+def generate(num_students, num_classes, seed=None, ranks=5, skew=1.0, density=0.3, slack=1.1, departments=1,
+             clustering=0.8):
+    """Returns a random PreferenceGrid; the same arguments and `seed` give the same grid."""
+    if not 1 <= departments <= num_classes:
+        raise ValueError(f"departments must be between 1 and the number of classes ({num_classes})")
+    rng = np.random.default_rng(seed)
+    # Separate streams, so the grid does not depend on the block size
+    rank_rng, available_rng = rng.spawn(2)
+    ranks = min(ranks, num_classes)
+    weights = popularity(num_classes, skew, rng)
+    department = class_departments(num_classes, departments)
+    home = rng.integers(departments, size=num_students)
+
+    # Log draw weight of each class for a student of each department
+    mass = np.bincount(department, weights=weights, minlength=departments)
+    log_weights = np.log(weights)
+    home_share, away_share = (1.0, 1.0) if departments == 1 else (clustering, 1.0 - clustering)
+    with np.errstate(divide="ignore"):
+        log_home = np.log(home_share / mass)
+        log_away = np.log(away_share / np.maximum(1.0 - mass, 1e-300))
+    by_department = log_weights + np.where(department == np.arange(departments)[:, None],
+                                           log_home[:, None], log_away[:, None])
+
+    rank = np.zeros((num_students, num_classes), dtype=rank_dtype(ranks))
+    available = np.zeros((num_students, num_classes), dtype=bool)
+    block = max(1, BLOCK_CELLS // max(num_classes, 1))
+    for start in range(0, num_students, block):
+        stop = min(start + block, num_students)
+        rows = np.arange(stop - start)[:, None]
+        # Gumbel top-k: the k largest perturbed log weights are a weighted sample without replacement
+        with np.errstate(divide="ignore"):
+            noise = -np.log(-np.log(rank_rng.random((stop - start, num_classes), dtype=np.float32)))
+        scores = by_department[home[start:stop]].astype(np.float32) + noise
+        top = np.argpartition(-scores, ranks - 1, axis=1)[:, :ranks]
+        top = top[rows, np.argsort(-scores[rows, top], axis=1)]
+        rank[start + rows, top] = np.arange(1, ranks + 1, dtype=rank.dtype)
+        available[start:stop] = available_rng.random((stop - start, num_classes), dtype=np.float32) < density
+        available[start:stop] &= rank[start:stop] == 0
+
+    students = [f"Student{i + 1} Lastname{i + 1}" for i in range(num_students)]
+    return PreferenceGrid(students, class_names(num_classes, departments),
+                          capacities(num_students, weights, slack, rng), rank, available)
+
+
+def _student_blocks(grid):
+    """The student sheet as DataFrames of at most BLOCK_CELLS cells, in the form export layout."""
+    import pandas as pd
+
+    num_students, num_classes = grid.shape
+    columns = ["First Name", "Last Name"] + [f"Rank [{c}]" for c in grid.classes] + \
+              [f"Available [{c}]" for c in grid.classes]
+    block = max(1, BLOCK_CELLS // max(2 * num_classes, 1))
+    for start in range(0, max(num_students, 1), block):
+        stop = min(start + block, num_students)
+        names = [student.rsplit(" ", 1) for student in grid.students[start:stop]]
+        rank = grid.rank[start:stop].astype(np.float32)
+        rank[rank == 0] = np.nan
+        data = {"First Name": [name[0] for name in names], "Last Name": [name[-1] for name in names]}
+        data.update(zip(columns[2:2 + num_classes], rank.T))
+        # Blank or "Available", stored as one-category codes instead of strings
+        codes = np.where(grid.available[start:stop], 0, -1).astype(np.int8)
+        data.update((name, pd.Categorical.from_codes(column, ["Available"]))
+                    for name, column in zip(columns[2 + num_classes:], codes.T))
+        yield pd.DataFrame(data, columns=columns)
+
+
+def _write_xlsx(grid, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for k, df in enumerate(_student_blocks(grid)):
+        if k == 0:
+            sheet.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            sheet.append([None if value != value else value for value in row])  # NaN -> empty cell
+    workbook.save(path)
+
+
+def write_students(grid, path):
+    """Writes the student sheet; the format follows the extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        return _write_xlsx(grid, path)
+    if extension == ".csv":
+        for k, df in enumerate(_student_blocks(grid)):
+            df.to_csv(path, mode="w" if k == 0 else "a", header=k == 0, index=False)
+        return
+    import pyarrow as pa
+
+    if extension == ".parquet":
+        import pyarrow.parquet as parquet
+
+        writer = None
+        try:
+            for df in _student_blocks(grid):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = parquet.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+    if extension == ".feather":
+        import pyarrow.feather as feather
+
+        tables = [pa.Table.from_pandas(df, preserve_index=False) for df in _student_blocks(grid)]
+        return feather.write_feather(pa.concat_tables(tables), path)
+    raise ValueError(f"Unsupported student file type {extension!r}")
+
+
+def write_classes(grid, path):
+    """Writes the two-column class sheet (Class, Spots)."""
+    import pandas as pd
+
+    df = pd.DataFrame({"Class": grid.classes, "Spots": grid.capacities})
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        df.to_excel(path, index=False)
+    elif extension == ".csv":
+        df.to_csv(path, index=False)
+    elif extension == ".parquet":
+        df.to_parquet(path, index=False)
+    elif extension == ".feather":
+        df.to_feather(path)
+    else:
+        raise ValueError(f"Unsupported class file type {extension!r}")
+
+
+def write_instance(grid, directory, formats=("xlsx",)):
+    """Writes `grid` into `directory` once per format; returns the files written."""
+    from .instance import save_instance
+
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for fmt in formats:
+        if fmt == "grid":
+            path = os.path.join(directory, "instance.grid")
+            save_instance(grid, path)
+            written.append(path)
+            continue
+        students, classes = (os.path.join(directory, f"{name}.{fmt}") for name in ("students", "classes"))
+        write_students(grid, students)
+        write_classes(grid, classes)
+        written += [students, classes]
+    return written
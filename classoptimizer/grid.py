@@ -0,0 +1,166 @@
+"""Preference grid parsed from the Google Form export into NumPy matrices."""
+import numpy as np
+
+from .model import FeasibleEdges
+from .timing import phase
+
+
+def classify_header(col, sanitize=None):
+    """Returns ("rank" | "available", class name) for a grid header, or None.
+
+    `Rank [X]` / `Available [X]` headers use the bracketed name, anything else
+    falls back to the header with the question prefix removed.
+    """
+    col = str(col)
+    if "Rank" in col:
+        kind, prefix = "rank", "Rank "
+    elif "Available" in col:
+        kind, prefix = "available", "Available "
+    else:
+        return None
+    if "[" in col and "]" in col:
+        class_name = col.split("[")[1].strip("]")
+    else:
+        class_name = col.replace(prefix, "").strip()
+    if sanitize is not None:
+        class_name = sanitize(class_name)
+    return kind, class_name
+
+
+def rank_dtype(max_rank):
+    """Smallest signed integer dtype that holds every rank."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_rank <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class PreferenceGrid:
+    """Students, classes and their rank/availability matrices.
+
+    `rank[i, j]` is student i's rank for class j (0 when unranked) and
+    `available[i, j]` is True when the student marked class j "Available".
+    Ranks are expected to be positive, as the form only offers 1-5.
+    """
+
+    def __init__(self, students, classes, capacities, rank, available):
+        self.students = list(students)
+        self.classes = list(classes)
+        self.capacities = np.asarray(capacities, dtype=np.int64)
+        self.rank = rank
+        self.available = available
+
+    @property
+    def shape(self):
+        return len(self.students), len(self.classes)
+
+    def class_capacities(self):
+        """Returns the {class: capacity} dict the scripts print."""
+        return dict(zip(self.classes, self.capacities.tolist()))
+
+    def take(self, students, classes, capacities=None):
+        """Sub-grid over the given student and class positions."""
+        students, classes = np.asarray(students, dtype=np.int64), np.asarray(classes, dtype=np.int64)
+        if capacities is None:
+            capacities = self.capacities[classes]
+        rows = np.ix_(students, classes)
+        return PreferenceGrid(
+            [self.students[i] for i in students], [self.classes[j] for j in classes],
+            capacities, self.rank[rows], self.available[rows],
+        )
+
+    def feasible(self):
+        """Boolean matrix of student/class pairs that may be assigned."""
+        return (self.rank > 0) | self.available
+
+    def class_candidates(self):
+        """Class -> candidates index: class j's students are `students[indptr[j]:indptr[j + 1]]`."""
+        cls, students = np.nonzero(self.feasible().T)
+        indptr = np.searchsorted(cls, np.arange(len(self.classes) + 1))
+        return indptr, students
+
+    def costs(self, max_dissatisfaction):
+        """Dissatisfaction matrix; only meaningful where `feasible()` is True."""
+        dtype = rank_dtype(max(max_dissatisfaction, int(self.rank.max(initial=0))))
+        return np.where(self.rank > 0, self.rank, max_dissatisfaction).astype(dtype)
+
+    def feasible_edges(self, max_dissatisfaction):
+        """Feasible pairs as FeasibleEdges, straight from the matrices."""
+        with phase("rank build") as counts:
+            student, cls = np.nonzero(self.feasible())
+            cost = np.where(self.rank[student, cls] > 0, self.rank[student, cls], max_dissatisfaction)
+            counts["pairs"] = len(cost)
+            return FeasibleEdges(student, cls, cost, len(self.students), len(self.classes))
+
+    def preferences(self):
+        """Returns the {student: {class: rank}} dict the scripts print."""
+        return {
+            s: {self.classes[j]: int(self.rank[i, j]) for j in np.flatnonzero(self.rank[i])}
+            for i, s in enumerate(self.students)
+        }
+
+    def availabilities(self):
+        """Returns the {student: [available classes]} dict the scripts print."""
+        return {
+            s: [self.classes[j] for j in np.flatnonzero(self.available[i])]
+            for i, s in enumerate(self.students)
+        }
+
+    @classmethod
+    def from_dicts(cls, classes, preferences, availabilities):
+        """Builds the grid from the GUI's {class: capacity}, top-5 and availability dicts."""
+        students = list(preferences)
+        class_index = {c: j for j, c in enumerate(classes)}
+        longest = max((len(preferences[s]) for s in students), default=0)
+        rank = np.zeros((len(students), len(classes)), dtype=rank_dtype(longest))
+        available = np.zeros((len(students), len(classes)), dtype=bool)
+        for i, s in enumerate(students):
+            # Iterate backwards so the first occurrence in a top 5 list wins
+            for position, class_name in reversed(list(enumerate(preferences[s]))):
+                if class_name in class_index:
+                    rank[i, class_index[class_name]] = position + 1
+            for class_name in availabilities.get(s, []):
+                if class_name in class_index:
+                    available[i, class_index[class_name]] = True
+        return cls(students, classes, list(classes.values()), rank, available)
+
+
+def parse_preference_grid(student_df, classes, sanitize=None):
+    """Parses the form export into a PreferenceGrid.
+
+    Every `Rank [X]` / `Available [X]` header after the two name columns is
+    classified (and sanitized) once, then each column is converted with
+    vectorized pandas/NumPy operations. Headers for classes missing from
+    `classes` ({class: capacity}) are ignored.
+    """
+    import pandas as pd
+
+    students = (student_df["First Name"] + " " + student_df["Last Name"]).tolist()
+    class_index = {c: j for j, c in enumerate(classes)}
+
+    rank_columns, available_columns = [], []
+    for col in student_df.columns[2:]:
+        header = classify_header(col, sanitize)
+        if header is None or header[1] not in class_index:
+            continue
+        kind, class_name = header
+        target = rank_columns if kind == "rank" else available_columns
+        target.append((col, class_index[class_name]))
+
+    shape = (len(students), len(classes))
+    rank_values = []
+    for col, j in rank_columns:
+        column = pd.to_numeric(student_df[col]).to_numpy(dtype=float)
+        present = ~np.isnan(column)
+        rank_values.append((j, column[present].astype(np.int64), present))
+
+    max_rank = max((int(column.max()) for _, column, _ in rank_values if column.size), default=0)
+    rank = np.zeros(shape, dtype=rank_dtype(max_rank))
+    for j, column, present in rank_values:
+        rank[present, j] = column
+
+    available = np.zeros(shape, dtype=bool)
+    for col, j in available_columns:
+        available[:, j] |= (student_df[col] == "Available").to_numpy()
+
+    return PreferenceGrid(students, classes, list(classes.values()), rank, available)
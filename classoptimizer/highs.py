@@ -0,0 +1,85 @@
+"""In-process HiGHS backend: the PuLP model as scipy.sparse arrays for scipy.optimize.milp."""
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_matrix, vstack
+
+from .solution import Solution, edge_amounts, is_integral
+from .timing import phase
+
+# scipy.optimize.milp status codes, named like PuLP's LpStatus
+STATUS = {0: "Optimal", 1: "Not Solved", 2: "Infeasible", 3: "Unbounded", 4: "Undefined"}
+
+
+def build_arrays(edges, capacities, weight_fill, supply=None, optional=False):
+    """Builds the objective, bounds and constraint rows of the assignment model.
+
+    Columns are the edge binaries followed by one unfilled slack per class;
+    rows are one-class-per-student (== 1, or == `supply` for compressed
+    profiles; <= with `optional`), capacity (<= cap) and unfilled
+    (slack + assigned >= cap), exactly as in `build_sparse_model`.
+    """
+    num_students, num_classes = len(edges.by_student), len(capacities)
+    num_edges = len(edges)
+    supply = np.ones(num_students) if supply is None else np.asarray(supply, dtype=np.float64)
+    num_columns = num_edges + num_classes
+    capacities = np.asarray(capacities, dtype=np.float64)
+    edge_ids = np.arange(num_edges)
+    ones = np.ones(num_edges)
+
+    c = np.concatenate([edges.cost.astype(np.float64), np.full(num_classes, float(weight_fill))])
+    students = coo_matrix((ones, (edges.student, edge_ids)), shape=(num_students, num_columns))
+    assigned = coo_matrix((ones, (edges.cls, edge_ids)), shape=(num_classes, num_columns))
+    slack = coo_matrix((np.ones(num_classes), (np.arange(num_classes), num_edges + np.arange(num_classes))), shape=(num_classes, num_columns))
+
+    A = vstack([students, assigned, assigned + slack]).tocsr()
+    lower = np.concatenate([np.zeros(num_students) if optional else supply, np.full(num_classes, -np.inf), capacities])
+    upper = np.concatenate([supply, capacities, np.full(num_classes, np.inf)])
+    integrality = np.concatenate([np.ones(num_edges), np.zeros(num_classes)])
+    bounds = Bounds(np.zeros(num_columns), np.concatenate([supply[edges.student], np.full(num_classes, np.inf)]))
+    return c, LinearConstraint(A, lower, upper), integrality, bounds
+
+
+def solve_highs_edges(edges, capacities, weight_fill, supply=None, time_limit=None, mode="auto", tol=1e-6):
+    """Solves the model over `edges` with HiGHS; returns (amount per edge, status, path).
+
+    The arrays only hold the network rows, so in "auto" mode the LP
+    relaxation is solved first and the MIP only runs if HiGHS returns a
+    fractional vertex. Without any edge (no classes, or no student who can
+    take one) nothing is solved: the model is Infeasible when a student
+    still has to be placed.
+    """
+    if not len(edges):
+        demand = len(edges.by_student) if supply is None else int(np.sum(supply))
+        return np.zeros(0, dtype=np.int64), "Infeasible" if demand else "Optimal", "no pairs"
+    with phase("model build") as counts:
+        c, constraints, integrality, bounds = build_arrays(edges, capacities, weight_fill, supply)
+        counts.update(variables=len(c), rows=constraints.A.shape[0], nonzeros=constraints.A.nnz)
+    options = {} if time_limit is None else {"time_limit": time_limit}
+    path = "mip"
+    if mode == "auto":
+        with phase("solver", engine="highs", model="lp"):
+            result = milp(c, constraints=constraints, integrality=np.zeros_like(integrality), bounds=bounds, options=options)
+            path = "lp" if result.x is None or is_integral(result.x[:len(edges)], tol) else "lp, fractional -> mip"
+    if path != "lp":
+        with phase("solver", engine="highs", model="mip"):
+            result = milp(c, constraints=constraints, integrality=integrality, bounds=bounds, options=options)
+
+    with phase("extract", variables=len(edges)):
+        amounts = np.zeros(len(edges), dtype=np.int64)
+        if result.x is not None:
+            amounts = edge_amounts(result.x[:len(edges)], tol)
+    return amounts, STATUS.get(result.status, result.message), path
+
+
+def solve_highs(grid, max_dissatisfaction=10, weight_fill=50, time_limit=None, mode="auto"):
+    """Solves the assignment MILP with HiGHS inside the Python process.
+
+    No model file is written and no solver process is spawned; the edge
+    binaries are mapped straight back onto a Solution.
+    """
+    edges = grid.feasible_edges(max_dissatisfaction)
+    amounts, status, path = solve_highs_edges(edges, grid.capacities, weight_fill, time_limit=time_limit, mode=mode)
+    assigned = np.full(len(grid.students), -1, dtype=np.int64)
+    chosen = amounts > 0
+    assigned[edges.student[chosen]] = edges.cls[chosen]
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=status, engine="highs", path=path)
@@ -0,0 +1,199 @@
+"""Reading the student form export and the class sheet.
+
+Both files may be Excel (.xlsx/.xls), CSV, Parquet or Feather, with the
+same headers in every format. CSV student sheets are read in chunks and
+Parquet/Feather ones only load the columns in use (Feather is memory-mapped).
+.xlsx student sheets are streamed: only the `First Name`, `Last Name`,
+`Rank [...]` and `Available [...]` columns are kept, and rows go straight
+into fixed-size NumPy chunks, so free-text columns are never materialized
+and memory stays bounded by the rank/availability matrices themselves.
+python-calamine is used through pandas when it is installed; otherwise the
+rows come from a read-only openpyxl workbook.
+"""
+import importlib.util
+import os
+import re
+
+import numpy as np
+
+from .grid import PreferenceGrid, classify_header, parse_preference_grid, rank_dtype
+from .timing import phase
+
+NAME_COLUMNS = ("First Name", "Last Name")
+FILE_TYPES = [
+    ("Schedule data", "*.xlsx;*.xls;*.csv;*.parquet;*.feather"),
+    ("Excel files", "*.xlsx;*.xls"),
+    ("CSV files", "*.csv"),
+    ("Parquet/Feather files", "*.parquet;*.feather"),
+]
+CSV_CHUNK_ROWS = 50000
+
+
+def underscore_name(name):
+    """Sanitize class names by replacing spaces and special characters with underscores."""
+    return re.sub(r'[^\w]', '_', str(name))
+
+
+def _extension(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def _read_columnar(path, columns=None):
+    """Reads a Parquet or Feather file into a DataFrame, optionally only `columns`.
+
+    `columns` may be a predicate on the column name; the file schema is
+    read first so pruned columns are never decoded.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.parquet as parquet
+
+    if _extension(path) == ".feather":
+        table = feather.read_table(path, memory_map=True)
+        names = table.column_names
+        if callable(columns):
+            table = table.select([name for name in names if columns(name)])
+        return table.to_pandas()
+    names = parquet.read_schema(path).names
+    if callable(columns):
+        columns = [name for name in names if columns(name)]
+    return parquet.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def read_class_file(class_file, sanitize=None):
+    """Reads the two-column class sheet into {class: capacity}."""
+    import pandas as pd
+
+    with phase("read classes") as counts:
+        extension = _extension(class_file)
+        if extension == ".csv":
+            class_df = pd.read_csv(class_file, names=["Class", "Capacity"], header=0)
+        elif extension in (".parquet", ".feather"):
+            class_df = _read_columnar(class_file)
+            class_df.columns = ["Class", "Capacity"]
+        else:
+            class_df = pd.read_excel(class_file, names=["Class", "Capacity"])
+        if sanitize is not None:
+            class_df["Class"] = class_df["Class"].apply(sanitize)
+        counts["classes"] = len(class_df)
+        return class_df.set_index("Class")["Capacity"].to_dict()
+
+
+def read_student_file(student_file, classes, sanitize=None):
+    """Reads the student form export into a PreferenceGrid over `classes`."""
+    import pandas as pd
+
+    extension = _extension(student_file)
+    wanted = lambda col: col in NAME_COLUMNS or _wanted(col, classes, sanitize)
+    calamine = extension == ".xlsx" and importlib.util.find_spec("python_calamine") is not None
+    if extension == ".csv" or (extension == ".xlsx" and not calamine):
+        # Rows are parsed as they are read, so both happen in one phase
+        with phase("read + parse") as counts:
+            if extension == ".csv":
+                chunks = pd.read_csv(student_file, usecols=wanted, chunksize=CSV_CHUNK_ROWS)
+                grid = concat_grids([parse_preference_grid(chunk, classes, sanitize) for chunk in chunks], classes)
+            else:
+                grid = stream_xlsx(student_file, classes, sanitize)
+            counts["students"] = len(grid.students)
+        return grid
+    with phase("read") as counts:
+        if extension in (".parquet", ".feather"):
+            student_df = _read_columnar(student_file, wanted)
+        elif calamine:
+            student_df = pd.read_excel(student_file, engine="calamine", usecols=wanted)
+        else:
+            student_df = pd.read_excel(student_file)
+        counts.update(rows=len(student_df), columns=len(student_df.columns))
+    with phase("parse", rows=len(student_df)):
+        return parse_preference_grid(student_df, classes, sanitize)
+
+
+def concat_grids(grids, classes):
+    """Stacks grids over the same classes (e.g. one per CSV chunk) into one."""
+    if not grids:
+        return PreferenceGrid([], classes, list(classes.values()), np.zeros((0, len(classes)), dtype=np.int8),
+                              np.zeros((0, len(classes)), dtype=bool))
+    max_rank = max(int(grid.rank.max(initial=0)) for grid in grids)
+    rank = np.concatenate([grid.rank for grid in grids]).astype(rank_dtype(max_rank), copy=False)
+    available = np.concatenate([grid.available for grid in grids])
+    students = [student for grid in grids for student in grid.students]
+    return PreferenceGrid(students, classes, list(classes.values()), rank, available)
+
+
+def _wanted(col, classes, sanitize):
+    header = classify_header(col, sanitize)
+    return header is not None and header[1] in classes
+
+
+def stream_xlsx(student_file, classes, sanitize=None, chunk_rows=4096):
+    """Builds the PreferenceGrid row by row from a read-only openpyxl workbook."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(student_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        first, last = (header.index(name) for name in NAME_COLUMNS)
+        class_index = {c: j for j, c in enumerate(classes)}
+        rank_columns, available_columns = [], []
+        # Same header rules as parse_preference_grid: everything after the two name columns
+        for col, name in enumerate(header[2:], start=2):
+            parsed = classify_header(name, sanitize) if name is not None else None
+            if parsed is None or parsed[1] not in class_index:
+                continue
+            kind, class_name = parsed
+            target = rank_columns if kind == "rank" else available_columns
+            target.append((col, class_index[class_name]))
+
+        kept = [first, last] + [col for col, _ in rank_columns + available_columns]
+        chunks = _Chunks(len(classes), chunk_rows)
+        for row in rows:
+            if len(row) < len(header):
+                row = row + (None,) * (len(header) - len(row))
+            # Blank rows (trailing formatting, deleted responses) are skipped
+            if all(row[col] is None for col in kept):
+                continue
+            rank, available = chunks.next_row(f"{row[first]} {row[last]}")
+            for col, j in rank_columns:
+                value = row[col]
+                if value is not None and value != "":
+                    rank[j] = float(value)
+            for col, j in available_columns:
+                if row[col] == "Available":
+                    available[j] = True
+    finally:
+        workbook.close()
+    students, rank, available = chunks.finish()
+    return PreferenceGrid(students, classes, list(classes.values()), rank, available)
+
+
+class _Chunks:
+    """Row storage that grows in fixed-size blocks instead of per-row lists."""
+
+    def __init__(self, num_classes, chunk_rows):
+        self.num_classes = num_classes
+        self.chunk_rows = chunk_rows
+        self.students = []
+        self.full = []
+        self._new_chunk()
+
+    def _new_chunk(self):
+        self.rank = np.zeros((self.chunk_rows, self.num_classes), dtype=np.int32)
+        self.available = np.zeros((self.chunk_rows, self.num_classes), dtype=bool)
+        self.used = 0
+
+    def next_row(self, student):
+        """Registers a student; returns the rank and availability rows to fill in."""
+        if self.used == self.chunk_rows:
+            self.full.append((self.rank, self.available))
+            self._new_chunk()
+        self.students.append(student)
+        i = self.used
+        self.used += 1
+        return self.rank[i], self.available[i]
+
+    def finish(self):
+        blocks = self.full + [(self.rank[:self.used], self.available[:self.used])]
+        max_rank = max((int(block.max(initial=0)) for block, _ in blocks), default=0)
+        rank = np.concatenate([block for block, _ in blocks]).astype(rank_dtype(max_rank), copy=False)
+        available = np.concatenate([block for _, block in blocks])
+        return self.students, rank, available
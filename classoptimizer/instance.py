@@ -0,0 +1,149 @@
+"""Loading the student/class workbooks, with a compiled binary instance cache.
+
+A compiled instance is one file: a small header (magic, version, JSON with
+the name tables and array layout) followed by the capacities, the rank
+matrix and the availability bitsets, each 64-byte aligned so they can be
+memory-mapped in place. Cache files are named after a SHA-256 of both input
+files' bytes and the parse settings, so an unchanged scenario skips Excel
+parsing entirely and an edited workbook simply misses.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .grid import PreferenceGrid
+from .ingest import read_class_file, read_student_file
+from .timing import phase
+
+MAGIC = b"COPTGRID"
+VERSION = 1
+CACHE_DIR = ".classoptimizer_cache"
+_ALIGN = 64
+
+
+def read_grid(student_file, class_file, sanitize=None):
+    """Parses both workbooks into a PreferenceGrid (no cache)."""
+    classes = read_class_file(class_file, sanitize)
+    return read_student_file(student_file, classes, sanitize)
+
+
+def sanitize_token(sanitize):
+    """Names a class-name sanitizer by module, qualified name and a hash of its code.
+
+    Scripts run as __main__ define different sanitizers under the same name,
+    so the name alone does not tell them apart.
+    """
+    if sanitize is None:
+        return "none"
+    name = f"{getattr(sanitize, '__module__', '')}.{getattr(sanitize, '__qualname__', type(sanitize).__qualname__)}"
+    code = getattr(sanitize, "__code__", None)
+    if code is None:
+        return name
+    body = code.co_code + repr((code.co_consts, code.co_names)).encode("utf-8")
+    return f"{name}:{hashlib.sha256(body).hexdigest()[:16]}"
+
+
+def instance_key(student_file, class_file, sanitize=None):
+    """Hash of both input files and the parse settings."""
+    digest = hashlib.sha256()
+    digest.update(f"{MAGIC.decode()} v{VERSION} sanitize={sanitize_token(sanitize)}\0".encode())
+    for path in (student_file, class_file):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _plain(values):
+    """Names as JSON-friendly Python scalars (NumPy ints/floats become int/float)."""
+    return [value.item() if isinstance(value, np.generic) else value for value in values]
+
+
+def save_instance(grid, path):
+    """Writes `grid` as a compiled instance; the file appears atomically."""
+    num_students, num_classes = grid.shape
+    arrays = [
+        ("capacities", np.ascontiguousarray(grid.capacities, dtype=np.int64)),
+        ("rank", np.ascontiguousarray(grid.rank)),
+        ("available", np.packbits(np.asarray(grid.available, dtype=bool), axis=1)),
+    ]
+    layout, offset = {}, 0
+    for name, array in arrays:
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout[name] = {"dtype": array.dtype.str, "shape": array.shape, "offset": offset}
+        offset += array.nbytes
+    header = json.dumps({
+        "students": _plain(grid.students),
+        "classes": _plain(grid.classes),
+        "num_students": num_students,
+        "num_classes": num_classes,
+        "arrays": layout,
+    }).encode("utf-8")
+    start = -(-(len(MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<II", VERSION, len(header)) + header)
+            for name, array in arrays:
+                f.seek(start + layout[name]["offset"])
+                f.write(array.tobytes())
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def load_instance(path):
+    """Memory-maps a compiled instance back into a PreferenceGrid."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compiled instance")
+        version, header_length = struct.unpack("<II", f.read(8))
+        if version != VERSION:
+            raise ValueError(f"{path} has instance version {version}, expected {VERSION}")
+        header = json.loads(f.read(header_length))
+    start = -(-(len(MAGIC) + 8 + header_length) // _ALIGN) * _ALIGN
+
+    def mapped(name):
+        spec = header["arrays"][name]
+        shape = tuple(spec["shape"])
+        if not np.prod(shape):
+            return np.zeros(shape, dtype=spec["dtype"])
+        return np.memmap(path, dtype=spec["dtype"], mode="r", offset=start + spec["offset"], shape=shape)
+
+    available = np.unpackbits(mapped("available"), axis=1, count=header["num_classes"]).astype(bool)
+    return PreferenceGrid(header["students"], header["classes"], mapped("capacities"), mapped("rank"), available)
+
+
+def load_grid(student_file, class_file, sanitize=None, cache_dir=None, use_cache=True):
+    """Returns (grid, cached) for the two workbooks.
+
+    The compiled instance lives in `cache_dir` (default: a `.classoptimizer_cache`
+    folder next to the student file). A cache that cannot be written, or a
+    damaged cache file, only costs the Excel parse.
+    """
+    if not use_cache:
+        return read_grid(student_file, class_file, sanitize), False
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(student_file)), CACHE_DIR)
+    path = os.path.join(cache_dir, instance_key(student_file, class_file, sanitize) + ".grid")
+    if os.path.exists(path):
+        try:
+            return load_instance(path), True
+        except (OSError, ValueError, struct.error):
+            pass
+    grid = read_grid(student_file, class_file, sanitize)
+    try:
+        with phase("compile instance"):
+            save_instance(grid, path)
+    except OSError:
+        pass
+    return grid, False
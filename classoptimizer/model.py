@@ -0,0 +1,124 @@
+"""Sparse PuLP model for the student/class assignment problem."""
+import re
+
+import numpy as np
+
+from .timing import phase
+
+
+class FeasibleEdges:
+    """Feasible (student, class) pairs with their dissatisfaction cost.
+
+    Students and classes are referred to by position, so the adjacency lists
+    `by_student[i]` and `by_class[j]` hold edge ids into the `student`, `cls`
+    and `cost` arrays.
+    """
+
+    def __init__(self, student, cls, cost, num_students, num_classes):
+        self.student = np.asarray(student, dtype=np.int64)
+        self.cls = np.asarray(cls, dtype=np.int64)
+        self.cost = np.asarray(cost, dtype=np.int64)
+        self.by_student = _group(self.student, num_students)
+        self.by_class = _group(self.cls, num_classes)
+
+    def __len__(self):
+        return len(self.cost)
+
+    def rankings(self, students, classes):
+        """Returns the {(student, class): rank} dict for feasible pairs only."""
+        return {
+            (students[i], classes[j]): cost
+            for i, j, cost in zip(self.student.tolist(), self.cls.tolist(), self.cost.tolist())
+        }
+
+
+def _group(keys, size):
+    """Splits edge ids into one list per key value (stable order)."""
+    if size == 0:
+        return []
+    order = np.argsort(keys, kind="stable")
+    bounds = np.searchsorted(keys[order], np.arange(1, size))
+    return [ids.tolist() for ids in np.split(order, bounds)]
+
+
+# Row names written by build_sparse_model
+NETWORK_ROWS = re.compile(r"(s|cap|fill)\d+$")
+
+
+def build_sparse_model(edges, capacities, weight_fill, name="TAAssignment", relaxed=False, supply=None,
+                       optional=False):
+    """Builds the assignment model with one binary per feasible edge.
+
+    With `relaxed` the edge variables are continuous instead. `supply` gives
+    a head count per student row (for compressed profiles); the edge
+    variables then become integers up to that count and each row must
+    place exactly that many students (at most that many with `optional`,
+    which lets students stay unplaced). Returns the problem, the list of edge
+    variables and the list of unfilled slack variables (one per class, in
+    `capacities` order).
+    """
+    with phase("model build", variables=len(edges) + len(capacities),
+               rows=len(edges.by_student) + 2 * len(capacities),
+               nonzeros=3 * len(edges) + len(capacities)):
+        return _build_sparse_model(edges, capacities, weight_fill, name, relaxed, supply, optional)
+
+
+def _build_sparse_model(edges, capacities, weight_fill, name, relaxed, supply, optional):
+    from pulp import LpProblem, LpMinimize, LpVariable, LpAffineExpression, lpSum
+
+    problem = LpProblem(name, LpMinimize)
+    if supply is None:
+        supply = [1] * len(edges.by_student)
+        bound = [1] * len(edges)
+    else:
+        supply = [int(count) for count in supply]
+        bound = [supply[i] for i in edges.student.tolist()]
+    if relaxed:
+        x = [LpVariable(f"x{e}", lowBound=0, upBound=bound[e], cat="Continuous") for e in range(len(edges))]
+    else:
+        x = [LpVariable(f"x{e}", lowBound=0, upBound=bound[e], cat="Integer") for e in range(len(edges))]
+    unfilled_penalty = [LpVariable(f"u{j}", lowBound=0, cat="Continuous") for j in range(len(capacities))]
+
+    # Objective function: Minimize dissatisfaction + weight of unfilled classes
+    objective = LpAffineExpression(zip(x, edges.cost.tolist()))
+    objective += weight_fill * lpSum(unfilled_penalty)
+    problem += objective, "TotalDissatisfaction"
+
+    # Constraints: Each student gets one class
+    for i, row in enumerate(edges.by_student):
+        if optional:
+            problem += lpSum(x[e] for e in row) <= supply[i], f"s{i}"
+        else:
+            problem += lpSum(x[e] for e in row) == supply[i], f"s{i}"
+
+    # Constraints: Class capacities
+    for j, column in enumerate(edges.by_class):
+        assigned_students = lpSum(x[e] for e in column)
+        problem += assigned_students <= capacities[j], f"cap{j}"
+        problem += unfilled_penalty[j] >= capacities[j] - assigned_students, f"fill{j}"
+
+    return problem, x, unfilled_penalty
+
+
+def is_network_model(problem):
+    """True when the problem only has the builder's student, capacity and fill rows.
+
+    Those rows have unit coefficients and integral right-hand sides, which
+    keeps the constraint matrix totally unimodular: the LP relaxation then
+    has integral vertices. Any side constraint added afterwards (a pinned
+    pair, a cap across classes...) is treated as breaking the structure.
+    """
+    for name, constraint in problem.constraints.items():
+        if not NETWORK_ROWS.match(name):
+            return False
+        if any(coefficient not in (1, -1) for coefficient in constraint.values()):
+            return False
+        if constraint.constant != int(constraint.constant):
+            return False
+    return True
+
+
+def set_integer(x):
+    """Turns relaxed edge variables back into integers (same bounds) for a MIP re-solve."""
+    for var in x:
+        var.cat = "Integer"
@@ -0,0 +1,123 @@
+"""Pareto frontier between total rank cost and total unfilled seats.
+
+The scripts' objective (rank cost + weight_fill * unfilled seats) picks a
+single point on this trade-off. Here a student may also stay unplaced, and
+the frontier is traced with an epsilon constraint on the unfilled total:
+minimize rank cost subject to unfilled <= eps, then set eps to one below
+the unfilled total just found, until no further seat can be filled. A
+tiny weight on the unfilled seats breaks ties, so each point uses the
+fewest unfilled seats its rank cost allows. The model is built once per
+frontier; between solves only the right-hand side of the epsilon row
+changes.
+"""
+import csv
+import os
+
+import numpy as np
+
+from .solution import Solution, edge_amounts
+
+ENGINES = ("cbc", "highs")
+POINT_COLUMNS = ("point", "unfilled_seats", "total_rank", "assigned", "unassigned", "status")
+ASSIGNMENT_COLUMNS = ("point", "student", "class", "rank")
+
+
+def _cbc_epsilon(edges, capacities, tie, solver, time_limit):
+    """Returns solve(eps) -> (edge values, status) over one reusable PuLP model."""
+    from pulp import PULP_CBC_CMD, LpStatus, lpSum
+
+    from .engines import _values
+    from .model import build_sparse_model
+
+    if solver is None:
+        solver = PULP_CBC_CMD(msg=False, timeLimit=time_limit)
+    problem, x, unfilled = build_sparse_model(edges, capacities, tie, name="ParetoFrontier", optional=True)
+    problem += lpSum(unfilled) <= int(np.sum(capacities)), "eps"
+
+    def solve(eps):
+        problem.constraints["eps"].changeRHS(eps)
+        problem.solve(solver)
+        return _values(x), LpStatus[problem.status]
+    return solve
+
+
+def _highs_epsilon(edges, capacities, tie, time_limit):
+    """Returns solve(eps) -> (edge values, status) over one set of HiGHS arrays."""
+    from scipy.optimize import LinearConstraint, milp
+    from scipy.sparse import csr_matrix, vstack
+
+    from .highs import STATUS, build_arrays
+
+    c, constraints, integrality, bounds = build_arrays(edges, capacities, tie, optional=True)
+    num_edges, num_columns = len(edges), len(c)
+    eps_row = csr_matrix((np.ones(num_columns - num_edges), (np.zeros(num_columns - num_edges, dtype=np.int64),
+                                                             np.arange(num_edges, num_columns))), shape=(1, num_columns))
+    A = vstack([constraints.A, eps_row]).tocsr()
+    lower = np.append(constraints.lb, -np.inf)
+    upper = np.append(constraints.ub, np.inf)
+    options = {} if time_limit is None else {"time_limit": time_limit}
+
+    def solve(eps):
+        upper[-1] = eps
+        result = milp(c, constraints=LinearConstraint(A, lower, upper), integrality=integrality, bounds=bounds,
+                      options=options)
+        values = np.zeros(num_edges) if result.x is None else result.x[:num_edges]
+        return values, STATUS.get(result.status, result.message)
+    return solve
+
+
+def pareto_frontier(grid, max_dissatisfaction=10, engine="cbc", solver=None, time_limit=None):
+    """Returns the frontier as Solutions, from no seats filled to the fewest unfilled seats.
+
+    Each Solution has weight_fill 0 (its total is the rank cost) and its
+    path records the epsilon bound it was solved under. `solver` is only
+    used by the "cbc" engine.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown frontier engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    edges = grid.feasible_edges(max_dissatisfaction)
+    seats = int(np.sum(grid.capacities))
+    # Rank costs are integers, so a total unfilled weight below 1 never outweighs one rank step
+    tie = 1.0 / (seats + 1)
+    if engine == "cbc":
+        solve = _cbc_epsilon(edges, grid.capacities, tie, solver, time_limit)
+    else:
+        solve = _highs_epsilon(edges, grid.capacities, tie, time_limit)
+
+    points, eps = [], seats
+    while eps >= 0:
+        values, status = solve(eps)
+        if status != "Optimal":
+            break
+        amounts = edge_amounts(values)
+        assigned = np.full(len(grid.students), -1, dtype=np.int64)
+        chosen = amounts > 0
+        assigned[edges.student[chosen]] = edges.cls[chosen]
+        solution = Solution(grid, assigned, max_dissatisfaction, 0, status=status, engine=engine,
+                            path=f"unfilled <= {eps}")
+        points.append(solution)
+        eps = int(solution.unfilled().sum()) - 1
+    return points
+
+
+def point_rows(points):
+    """One summary row per frontier point (see POINT_COLUMNS)."""
+    return [
+        (k, int(point.unfilled().sum()), point.total_rank, int((point.assigned >= 0).sum()),
+         int((point.assigned < 0).sum()), point.status)
+        for k, point in enumerate(points)
+    ]
+
+
+def write_frontier(points, out_dir):
+    """Writes `frontier.csv` (one row per point) and `assignments.csv` (every point's placements)."""
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "frontier.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(POINT_COLUMNS)
+        writer.writerows(point_rows(points))
+    with open(os.path.join(out_dir, "assignments.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(ASSIGNMENT_COLUMNS)
+        for k, point in enumerate(points):
+            writer.writerows((k, student, c, rank) for student, (c, rank) in point.assignments().items())
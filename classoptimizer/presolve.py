@@ -0,0 +1,101 @@
+"""Presolve pass that strips trivial structure from a PreferenceGrid before model building."""
+import numpy as np
+
+from .solution import Solution
+
+
+class Presolve:
+    """Reduced grid plus what was fixed or dropped to get there.
+
+    `students` and `classes` map positions in the reduced grid back to the
+    original one; `fixed` holds the class forced on each student (-1 when
+    the student was left to the solver or dropped).
+    """
+
+    def __init__(self, grid, max_dissatisfaction):
+        self.original = grid
+        self.max_dissatisfaction = max_dissatisfaction
+        num_students, num_classes = grid.shape
+        feasible = grid.feasible()
+        capacity = grid.capacities.copy()
+        active_students = np.ones(num_students, dtype=bool)
+        active_classes = np.ones(num_classes, dtype=bool)
+        self.fixed = np.full(num_students, -1, dtype=np.int64)
+        self.dropped_students = []
+        self.dropped_classes = []
+        self.charged = 0
+
+        while True:
+            # Classes nobody can take (or with no seats left) leave the model
+            candidates = feasible[active_students].sum(axis=0)
+            dead = np.flatnonzero(active_classes & ((candidates == 0) | (capacity <= 0)))
+            self.charged += int(np.maximum(capacity[dead], 0).sum())
+            active_classes[dead] = False
+            feasible[:, dead] = False
+            self.dropped_classes.extend(dead.tolist())
+
+            degree = feasible.sum(axis=1)
+            stranded = np.flatnonzero(active_students & (degree == 0))
+            active_students[stranded] = False
+            self.dropped_students.extend(stranded.tolist())
+
+            # Students with a single feasible class must take it, if it has room for all of them
+            forced = np.flatnonzero(active_students & (degree == 1))
+            forced_class = feasible[forced].argmax(axis=1) if len(forced) else forced
+            demand = np.bincount(forced_class, minlength=num_classes)
+            fits = demand[forced_class] <= capacity[forced_class]
+            forced, forced_class = forced[fits], forced_class[fits]
+            self.fixed[forced] = forced_class
+            capacity -= np.bincount(forced_class, minlength=num_classes)
+            active_students[forced] = False
+            feasible[forced] = False
+
+            if not (len(dead) or len(stranded) or len(forced)):
+                break
+
+        self.students = np.flatnonzero(active_students)
+        self.classes = np.flatnonzero(active_classes)
+        candidates = feasible[np.ix_(self.students, self.classes)].sum(axis=0)
+        remaining = capacity[self.classes]
+        # Undersubscribed classes can admit every candidate; their extra seats stay unfilled anyway
+        self.shrunk = int((candidates < remaining).sum())
+        self.grid = grid.take(self.students, self.classes, np.minimum(remaining, candidates))
+
+    def counts(self):
+        """(variables, rows) of the assignment model before and after presolve."""
+        def size(grid):
+            num_students, num_classes = grid.shape
+            edges = int(grid.feasible().sum()) if num_students and num_classes else 0
+            return edges + num_classes, num_students + 2 * num_classes
+        return size(self.original), size(self.grid)
+
+    def log(self):
+        """Lines describing what presolve removed."""
+        (variables, rows), (kept_variables, kept_rows) = self.counts()
+        lines = [
+            f"Presolve: fixed {int((self.fixed >= 0).sum())} forced assignments, "
+            f"dropped {len(self.dropped_classes)} classes without candidates ({self.charged} seats charged as unfilled), "
+            f"dropped {len(self.dropped_students)} students without a feasible class, "
+            f"shrank {self.shrunk} undersubscribed capacities",
+            f"Presolve removed {variables - kept_variables} of {variables} variables and {rows - kept_rows} of {rows} rows",
+        ]
+        if self.dropped_students:
+            lines.append("Students with no feasible class: " + ", ".join(self.original.students[i] for i in self.dropped_students))
+        return lines
+
+    def reduce(self, assigned):
+        """Maps an assignment of the original grid (e.g. a warm start) onto the reduced grid."""
+        position = np.full(len(self.original.classes), -1, dtype=np.int64)
+        position[self.classes] = np.arange(len(self.classes))
+        assigned = np.asarray(assigned, dtype=np.int64)[self.students]
+        return np.where(assigned >= 0, position[assigned], -1)
+
+    def expand(self, solution):
+        """Maps a Solution of the reduced grid back onto the original grid."""
+        assigned = self.fixed.copy()
+        placed = solution.assigned >= 0
+        assigned[self.students[placed]] = self.classes[solution.assigned[placed]]
+        full = Solution(self.original, assigned, self.max_dissatisfaction, solution.weight_fill,
+                        status=solution.status, engine=solution.engine, path=solution.path)
+        full.presolve = self
+        return full
@@ -0,0 +1,132 @@
+"""Leveled, buffered run reports for the optimize_schedule scripts.
+
+The console only gets lines at or below the chosen verbosity; an optional
+report file (plain text, or gzip/xz compressed by extension) gets every
+line, so the per-student dumps can go to disk while the console keeps to
+totals, timing and unfilled classes. Both outputs are written in blocks
+instead of one `print` per line. Timed blocks are phases of the report's
+PhaseTimer (see timing.py), whose table closes every report file.
+"""
+import gzip
+import lzma
+import sys
+import time
+from contextlib import contextmanager
+
+from .timing import PhaseTimer
+
+QUIET, SUMMARY, DETAIL, DEBUG = range(4)
+LEVELS = {"quiet": QUIET, "summary": SUMMARY, "detail": DETAIL, "debug": DEBUG}
+
+
+def open_report_file(path):
+    """Opens a text report for writing; .gz and .xz paths are compressed."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    if path.endswith(".xz"):
+        return lzma.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+class Report:
+    """Collects report lines and writes them out in buffered blocks.
+
+    `verbosity` is one of LEVELS (or its number). Lines are tagged with the
+    level they belong to: SUMMARY for totals and warnings, DETAIL for the
+    per-student results, DEBUG for the input dumps. `timer` collects the
+    phases (default: a new PhaseTimer without profiling).
+    """
+
+    def __init__(self, verbosity="summary", path=None, stream=None, buffer_lines=1000, timer=None):
+        self.level = LEVELS[verbosity] if isinstance(verbosity, str) else verbosity
+        self.path = path
+        self.stream = stream or sys.stdout
+        self.file = open_report_file(path) if path else None
+        self.buffer_lines = buffer_lines
+        self.timer = timer or PhaseTimer()
+        self.timings = []
+        self._console = []
+        self._file = []
+
+    def write(self, level, text=""):
+        if level <= self.level:
+            self._console.append(text)
+            if len(self._console) >= self.buffer_lines:
+                self._flush_console()
+        if self.file is not None:
+            self._file.append(text)
+            if len(self._file) >= self.buffer_lines:
+                self._flush_file()
+
+    def summary(self, text=""):
+        self.write(SUMMARY, text)
+
+    def detail(self, text=""):
+        self.write(DETAIL, text)
+
+    def debug(self, text=""):
+        self.write(DEBUG, text)
+
+    def section(self, level, title, lines):
+        """Writes a titled block; the lines are only formatted if some output wants them."""
+        if level > self.level and self.file is None:
+            return
+        self.write(level, title)
+        for line in lines:
+            self.write(level, line)
+
+    def wants(self, level):
+        """True when lines at `level` reach the console or the report file."""
+        return level <= self.level or self.file is not None
+
+    @contextmanager
+    def timed(self, label, **counts):
+        """Runs the enclosed block as a phase; pending lines are flushed first.
+
+        Yields the phase's counts dict for the block to fill in.
+        """
+        self.flush()
+        start = time.perf_counter()
+        try:
+            with self.timer.phase(label, **counts) as phase_counts:
+                yield phase_counts
+        finally:
+            self.timings.append((label, time.perf_counter() - start))
+
+    def timing_line(self):
+        return "⏱️ " + ", ".join(f"{label} {seconds:.2f}s" for label, seconds in self.timings)
+
+    def _flush_console(self):
+        if self._console:
+            self.stream.write("\n".join(self._console) + "\n")
+            self._console = []
+        self.stream.flush()
+
+    def _flush_file(self):
+        if self._file:
+            self.file.write("\n".join(self._file) + "\n")
+            self._file = []
+
+    def flush(self):
+        if self.file is not None:
+            self._flush_file()
+        self._flush_console()
+
+    def close(self):
+        """Writes the timing line and phase table, then flushes and closes the report file."""
+        if self.timings:
+            self.summary(self.timing_line())
+        if self.timer.phases:
+            self.section(DETAIL, "\n⏱️ Phases:", self.timer.lines())
+        if self.file is not None:
+            self.summary(f"📝 Full report written to {self.path}")
+            self._flush_file()
+            self.file.close()
+            self.file = None
+        self._flush_console()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,163 @@
+"""Content-addressed cache of solved assignments.
+
+A result is keyed by a SHA-256 over the instance itself (class names and
+capacities, student names, the rank matrix and availability bitsets), the
+weights, the solve settings and the solver library version, so pressing
+"Optimize" twice on an unchanged instance, or re-submitting an identical
+job, skips the solve. Entries live in an in-process LRU and, optionally, in
+a size-bounded folder of small .npz files shared between processes and
+runs. Only optimal results are cached.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+from .solution import Solution
+
+RESULT_VERSION = 1  # Bump when a change to the engines can change their results
+# Library whose version is part of each engine's results
+ENGINE_LIBRARIES = {"cbc": "pulp", "highs": "scipy", "scipy": "scipy", "flow": None}
+MAX_ENTRIES = 128
+MAX_DISK_BYTES = 64 << 20
+# Disk tier for callers without an input file to keep it next to (the GUIs, the service)
+USER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".classoptimizer_cache", "results")
+
+
+def engine_version(engine):
+    library = ENGINE_LIBRARIES.get(engine)
+    if library is None:
+        return f"{engine} r{RESULT_VERSION}"
+    try:
+        return f"{engine} r{RESULT_VERSION} {library} {version(library)}"
+    except PackageNotFoundError:
+        return f"{engine} r{RESULT_VERSION} {library} unknown"
+
+
+def result_key(grid, engine, max_dissatisfaction, weight_fill, **settings):
+    """Canonical hash of the instance, the weights, `settings` and the engine version."""
+    digest = hashlib.sha256()
+    header = {
+        "engine": engine_version(engine),
+        "max_dissatisfaction": max_dissatisfaction,
+        "weight_fill": float(weight_fill),
+        "settings": {key: settings[key] for key in sorted(settings)},
+        "classes": [str(c) for c in grid.classes],
+        "students": [str(s) for s in grid.students],
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode("utf-8") + b"\0")
+    # Fixed dtypes, so the same instance hashes the same whatever dtype it was loaded with
+    digest.update(np.ascontiguousarray(grid.capacities, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(grid.rank, dtype=np.int64).tobytes())
+    digest.update(np.packbits(np.asarray(grid.available, dtype=bool), axis=None).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU of solved assignments with an optional on-disk tier.
+
+    `max_entries` bounds the in-process tier; `cache_dir` (None for memory
+    only) holds one file per result and is trimmed, least recently used
+    first, to `max_disk_bytes`.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, cache_dir=None, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key):
+        """Returns (assigned, status, engine, path) for `key`, or None."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if self.cache_dir is not None:
+            try:
+                with np.load(self._path(key)) as data:
+                    meta = json.loads(str(data["meta"]))
+                    entry = (data["assigned"], meta["status"], meta["engine"], meta["path"])
+                os.utime(self._path(key))
+            except (OSError, KeyError, ValueError):
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def put(self, key, assigned, status, engine, path):
+        entry = (np.asarray(assigned, dtype=np.int64), status, engine, path)
+        self._remember(key, entry)
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, assigned=entry[0], meta=json.dumps({"status": status, "engine": engine, "path": path}))
+                os.replace(temp, self._path(key))
+            except BaseException:
+                os.unlink(temp)
+                raise
+            self._trim_disk()
+        except OSError:
+            pass  # A cache that cannot be written only costs the next solve
+
+    def _remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def solve(self, grid, engine="cbc", max_dissatisfaction=10, weight_fill=50, **options):
+        """engines.solve through the cache; returns (solution, hit).
+
+        `options` are passed on to engines.solve; those that can change the
+        result (mode, presolve, compress) are part of the key, while the
+        solver, workers and time limit are not.
+        """
+        from .engines import solve
+
+        defaults = {"mode": "auto", "presolve": True, "compress": True}
+        settings = {key: options.get(key, default) for key, default in defaults.items()}
+        key = result_key(grid, engine, max_dissatisfaction, weight_fill, **settings)
+        entry = self.get(key)
+        if entry is not None:
+            assigned, status, solved_by, path = entry
+            return Solution(grid, assigned, max_dissatisfaction, weight_fill, status, solved_by, path), True
+        solution = solve(grid, engine, max_dissatisfaction, weight_fill, **options)
+        if solution.status == "Optimal":
+            self.put(key, solution.assigned, solution.status, solution.engine, solution.path)
+        return solution, False
+
+    def stats(self):
+        return f"{self.hits} hits ({self.disk_hits} from disk), {self.misses} misses"
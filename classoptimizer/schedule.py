@@ -0,0 +1,107 @@
+"""One optimization run: load the two input files, solve and report.
+
+This is the body of the optimize_schedule scripts without the file
+dialogs, so the command line, the FINALPRODUCT scripts and anything that
+drives several runs share one implementation.
+"""
+import os
+
+from .instance import CACHE_DIR, load_grid
+from .report import DEBUG, DETAIL
+from .results import ResultCache
+
+MAX_DISSATISFACTION = 10  # Cost of an available but unranked class
+WEIGHT_FILL = 50  # Penalty per unfilled class slot
+
+
+def run_schedule(student_file, class_file, report, engine="cbc", max_dissatisfaction=MAX_DISSATISFACTION,
+                 weight_fill=WEIGHT_FILL, solver=None, workers=None, mode="auto", presolve=True,
+                 sanitize=None, use_cache=True, diagnostics=False, time_limit=None, results=None):
+    """Solves one student/class file pair, writing the run to `report`; returns the Solution.
+
+    With `diagnostics` the summary also explains why each unfilled class
+    stayed unfilled. `solver` is only used by the "cbc" engine (default:
+    CBC, chatty at the DEBUG level only). `time_limit` caps each solver
+    call, in seconds. With `use_cache` optimal results are also cached
+    (see results.ResultCache), by default in the instance cache folder.
+    """
+    if results is None and use_cache:
+        results = ResultCache(cache_dir=os.path.join(os.path.dirname(os.path.abspath(student_file)), CACHE_DIR, "results"))
+
+    report.summary(f"Student file: {student_file}")
+    report.summary(f"Class file: {class_file}")
+
+    # Load Data: both workbooks are compiled into a cached binary instance on the
+    # first run, so re-running an unchanged scenario skips Excel parsing entirely
+    with report.timed("load") as counts:
+        grid, cached = load_grid(student_file, class_file, sanitize=sanitize, use_cache=use_cache)
+        classes = grid.class_capacities()
+        counts.update(students=len(grid.students), classes=len(grid.classes), cached=cached)
+    if cached:
+        report.summary("⚡ Loaded the compiled instance from the cache")
+
+    # Debug: Class list, preferences and availabilities
+    report.section(DEBUG, "\n📌 Class List and Capacities:", (f"  - {cls}: {cap} spots" for cls, cap in classes.items()))
+    if report.wants(DEBUG):
+        report.section(DEBUG, "\n📌 Student Preferences:", (f"  - {student}: {ranks}" for student, ranks in grid.preferences().items()))
+        report.section(DEBUG, "\n📌 Student Availabilities:", (f"  - {student}: {available}" for student, available in grid.availabilities().items()))
+
+        # Feasible (student, class) pairs and their ranks; unavailable pairs never enter the model
+        rankings = grid.feasible_edges(max_dissatisfaction).rankings(grid.students, grid.classes)
+        report.section(DEBUG, "\n📌 Student Rankings for Classes:", (f"  - {student} -> {class_name}: Rank {rank}" for (student, class_name), rank in rankings.items()))
+
+    # Solve with the selected engine ("cbc", "highs", "flow" or "scipy"); independent
+    # groups of students and classes are solved in parallel on `workers` processes
+    with report.timed("solve", engine=engine) as counts:
+        if solver is None and engine == "cbc":
+            from pulp import PULP_CBC_CMD
+
+            solver = PULP_CBC_CMD(msg=report.level >= DEBUG, timeLimit=time_limit)
+        options = dict(solver=solver, mode=mode, presolve=presolve, workers=workers, time_limit=time_limit)
+        if results is not None:
+            solution, hit = results.solve(grid, engine, max_dissatisfaction, weight_fill, **options)
+        else:
+            from .engines import solve
+
+            solution, hit = solve(grid, engine, max_dissatisfaction, weight_fill, **options), False
+        counts.update(status=solution.status, cached=hit)
+    with report.timed("report"):
+        _write_solution(report, solution, grid, results if hit else None, diagnostics)
+    return solution
+
+
+def _write_solution(report, solution, grid, results=None, diagnostics=False):
+    """The result part of the run report; `results` is the cache a hit came from."""
+    if results is not None:
+        report.summary(f"⚡ Reused a cached result ({results.stats()})")
+    report.summary(f"\n🔧 Solved with {solution.engine}" + (f" ({solution.path})" if solution.path else ""))
+    if solution.presolve:
+        report.summary("🧹 " + "\n   ".join(solution.presolve.log()))
+    if solution.status != "Optimal":
+        report.summary(f"\n⚠️ Solver status: {solution.status}")
+        report.summary(f"   Students that could not be placed: {solution.unassigned()}")
+
+    # Extract total dissatisfaction
+    report.summary(f"\n✅ Total Dissatisfaction: {solution.total_dissatisfaction}")
+
+    # Extract unfilled classes and slots
+    report.summary(f"\n📌 Unfilled Classes and Slots: {solution.unfilled_classes()}")
+
+    # Extract each student's assigned class and their rank
+    assignments = solution.assignments()
+    report.section(DETAIL, "\n📌 Student Assignments:", (f"  - {s} assigned to {c} with rank {rank}" for s, (c, rank) in assignments.items()))
+    if not assignments:
+        report.summary("⚠️ No student assignments were made! Check constraints.")
+    else:
+        report.summary(f"\n📌 {len(assignments)} of {len(grid.students)} students assigned")
+
+    if diagnostics:
+        # Debugging: Why are classes going unfilled?
+        report.summary("\n🔍 Debugging Unfilled Classes:")
+        for c, unfilled, waiting in solution.unfilled_diagnostics():
+            report.summary(f"⚠️ {c} has {unfilled} unfilled spots.")
+            if not waiting:
+                report.summary(f"   🚨 No students available for {c}")
+            else:
+                report.summary(f"   🔹 Available students but not assigned: {waiting}")
+    report.flush()
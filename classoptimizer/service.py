@@ -0,0 +1,405 @@
+"""Local HTTP optimization service for index.html.
+
+    python -m classoptimizer serve --port 5000 --workers 2
+
+An asyncio server on 127.0.0.1 with no dependencies beyond the standard
+library. Solves run in a process pool whose workers import the engines
+once at start-up, so a request pays for neither interpreter nor solver
+start-up (the default "highs" engine also runs in-process, with no CBC
+executable spawned per solve). Endpoints:
+
+    POST /optimize          {classes: [{name, capacity}], students: [{name, preference: [...]}]}
+                            -> the result, or 202 + {job, poll} for large or `"async": true` requests
+    GET  /jobs/<id>         job status, with the result once it is done
+    GET  /jobs/<id>/stream  NDJSON: status events, then the summary, then one line per assignment
+    GET  /stats             result cache hits and misses
+
+POST /optimize?stream=1 streams the same NDJSON directly. Students may also
+list `available` classes; `engine`, `max_dissatisfaction`, `weight_fill`
+and `time_limit` are optional request fields. The job queue is bounded: a
+full queue answers 503, and each job is given up on after its time limit
+plus a grace period, after which its worker process is killed and replaced
+so a runaway solve cannot hold a slot. Optimal results are cached by a hash of the instance
+(see results.ResultCache), so a repeated request is answered without
+queueing a job.
+"""
+import asyncio
+import itertools
+import json
+import math
+import os
+import signal
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit
+
+HOST = "127.0.0.1"
+PORT = 5000
+QUEUE_SIZE = 32
+TIME_LIMIT = 30.0  # Seconds per request, also the most a request may ask for
+GRACE = 5.0  # Extra seconds before a job whose solver ignores the limit is given up on
+SYNC_CELLS = 20000  # Students x classes above which POST /optimize answers with a job ID
+KEEP_JOBS = 1000  # Finished jobs kept for polling
+STREAM_LINES = 500  # Assignment lines per streamed chunk
+REASONS = {200: "OK", 202: "Accepted", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+MAX_BODY = 64 << 20
+MAX_COST = 1 << 30  # Largest max_dissatisfaction a request may ask for
+
+
+def _warm_up():
+    """Process-pool initializer: imports the engines before the first request arrives."""
+    from . import engines, highs  # noqa: F401
+    import pulp  # noqa: F401
+
+
+def grid_from_request(payload):
+    """Builds the PreferenceGrid for an index.html request; raises ValueError when malformed."""
+    from .grid import PreferenceGrid
+
+    try:
+        classes = {str(c["name"]): int(c["capacity"]) for c in payload["classes"]}
+        preferences, availabilities = {}, {}
+        for student in payload["students"]:
+            name = str(student["name"])
+            preference, available = student.get("preference", []), student.get("available", [])
+            if not isinstance(preference, list) or not isinstance(available, list):
+                raise TypeError(f"preference and available of {name!r} must be lists of class names")
+            preferences[name] = [str(c) for c in preference if str(c)]
+            availabilities[name] = [str(c) for c in available]
+    except (KeyError, TypeError, ValueError, OverflowError) as exc:
+        raise ValueError(f"Expected {{classes: [{{name, capacity}}], students: [{{name, preference}}]}} ({exc!r})")
+    return PreferenceGrid.from_dicts(classes, preferences, availabilities)
+
+
+def request_settings(payload):
+    """(engine, max_dissatisfaction, weight_fill) of a request, with the service defaults."""
+    try:
+        max_dissatisfaction = int(payload.get("max_dissatisfaction", 10))
+        weight_fill = float(payload.get("weight_fill", 50))
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ValueError(f"max_dissatisfaction and weight_fill must be finite numbers ({exc!r})")
+    # Costs are stored as integers of at most 32 bits
+    if not 0 < max_dissatisfaction <= MAX_COST or not math.isfinite(weight_fill):
+        raise ValueError(f"max_dissatisfaction must be between 1 and {MAX_COST} and weight_fill finite")
+    return payload.get("engine", "highs"), max_dissatisfaction, weight_fill
+
+
+def request_time_limit(payload, most):
+    """The request's `time_limit` in seconds, at most `most`; raises ValueError when it is not a positive number."""
+    try:
+        time_limit = float(payload.get("time_limit", most))
+    except (TypeError, ValueError):
+        time_limit = math.nan
+    if not time_limit > 0:
+        raise ValueError(f"time_limit must be a positive number of seconds, not {payload.get('time_limit')!r}")
+    return min(time_limit, most)
+
+
+def result_body(solution, seconds, cached=False):
+    return {
+        "status": solution.status,
+        "engine": solution.engine,
+        "path": solution.path,
+        "cached": cached,
+        "total_dissatisfaction": solution.total_dissatisfaction,
+        "assignments": {student: {"class": c, "rank": rank} for student, (c, rank) in solution.assignments().items()},
+        "unfilled": solution.unfilled_classes(),
+        "unassigned": solution.unassigned(),
+        "seconds": round(seconds, 3),
+    }
+
+
+def solve_request(payload, time_limit):
+    """Worker entry point: solves one request; returns the JSON-ready result and the assignment."""
+    from .engines import solve
+
+    start = time.perf_counter()
+    grid = grid_from_request(payload)
+    solution = solve(grid, *request_settings(payload), time_limit=time_limit, workers=1)
+    return result_body(solution, time.perf_counter() - start), solution.assigned
+
+
+class Job:
+    """One queued request and, once finished, its result or error."""
+
+    def __init__(self, job_id, payload, time_limit):
+        self.id = job_id
+        self.payload = payload
+        self.time_limit = time_limit
+        self.key = None  # Result cache key
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.changed = asyncio.Event()
+
+    def set_status(self, status):
+        self.status = status
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def describe(self):
+        body = {"job": self.id, "status": self.status}
+        if self.error is not None:
+            body["error"] = self.error
+        if self.result is not None:
+            body["result"] = self.result
+        return body
+
+
+class OptimizationService:
+    """Bounded job queue in front of warm solver processes.
+
+    Each runner owns a one-process pool, so the worker of a job that runs
+    past its time limit can be killed and replaced without touching the
+    jobs running on the others.
+    """
+
+    def __init__(self, workers=2, queue_size=QUEUE_SIZE, time_limit=TIME_LIMIT, cache_dir=None):
+        from .results import ResultCache
+
+        self.workers = workers
+        self.time_limit = time_limit
+        self.results = ResultCache(cache_dir=cache_dir)
+        self.queue = asyncio.Queue(queue_size)
+        self.jobs = OrderedDict()
+        self.ids = itertools.count(1)
+        self.pools = []  # (executor, worker pid) per runner
+        self.runners = []
+
+    async def _start_worker(self):
+        """A warm one-process pool and the pid of its worker."""
+        pool = ProcessPoolExecutor(max_workers=1, initializer=_warm_up)
+        # Start the worker now instead of on its first request
+        pid = await asyncio.get_running_loop().run_in_executor(pool, os.getpid)
+        return pool, pid
+
+    async def _replace_worker(self, k):
+        """Kills runner `k`'s worker, abandoning its solve, and starts a fresh one."""
+        pool, pid = self.pools[k]
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass  # Already gone
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.pools[k] = await self._start_worker()
+
+    async def start(self):
+        self.pools = list(await asyncio.gather(*(self._start_worker() for _ in range(self.workers))))
+        self.runners = [asyncio.create_task(self._run(k)) for k in range(self.workers)]
+
+    async def stop(self):
+        for runner in self.runners:
+            runner.cancel()
+        for pool, _ in self.pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, payload):
+        """Queues a request, or answers it from the result cache.
+
+        Raises asyncio.QueueFull when the queue is full.
+        """
+        from .engines import ENGINES
+        from .results import result_key
+        from .solution import Solution
+
+        start = time.perf_counter()
+        grid = grid_from_request(payload)  # Reject malformed requests before they take a slot
+        engine, max_dissatisfaction, weight_fill = request_settings(payload)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}")
+        time_limit = request_time_limit(payload, self.time_limit)
+        job = Job(str(next(self.ids)), payload, time_limit)
+        # solve_request leaves mode, presolve and compress at their defaults
+        job.key = result_key(grid, engine, max_dissatisfaction, weight_fill, mode="auto", presolve=True, compress=True)
+        entry = self.results.get(job.key)
+        if entry is not None:
+            assigned, status, solved_by, path = entry
+            solution = Solution(grid, assigned, max_dissatisfaction, weight_fill, status, solved_by, path)
+            job.result = result_body(solution, time.perf_counter() - start, cached=True)
+            job.status = "done"
+        else:
+            self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        while len(self.jobs) > KEEP_JOBS + self.queue.maxsize:
+            self.jobs.popitem(last=False)
+        return job
+
+    async def _run(self, k):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.set_status("running")
+            try:
+                job.result, assigned = await asyncio.wait_for(
+                    loop.run_in_executor(self.pools[k][0], solve_request, job.payload, job.time_limit),
+                    job.time_limit + GRACE,
+                )
+                if job.result["status"] == "Optimal":
+                    self.results.put(job.key, assigned, job.result["status"], job.result["engine"], job.result["path"])
+                job.set_status("done")
+            except asyncio.TimeoutError:
+                job.error = f"No result within {job.time_limit + GRACE:.0f}s"
+                job.set_status("failed")
+                # "flow" and "scipy" ignore the time limit: don't leave the worker solving
+                await self._replace_worker(k)
+            except BrokenProcessPool:
+                job.error = "The solver process died"
+                job.set_status("failed")
+                await self._replace_worker(k)
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.set_status("failed")
+            finally:
+                self.queue.task_done()
+
+    async def wait(self, job):
+        while job.status in ("queued", "running"):
+            await job.changed.wait()
+
+    async def events(self, job):
+        """Yields NDJSON-ready dicts: each status change, then the summary and the assignments."""
+        yield {"job": job.id, "status": job.status, "queued": self.queue.qsize()}
+        while job.status in ("queued", "running"):
+            await job.changed.wait()
+            yield {"job": job.id, "status": job.status}
+        if job.result is None:
+            yield {"job": job.id, "error": job.error}
+            return
+        summary = {key: value for key, value in job.result.items() if key != "assignments"}
+        yield {"job": job.id, "summary": summary}
+        for student, assignment in job.result["assignments"].items():
+            yield {"student": student, **assignment}
+
+
+async def _read_request(reader):
+    """Returns (method, target, headers, body) or None when the client went away."""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        raise OverflowError(length)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _head(status, content_type="application/json", extra=()):
+    lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {content_type}", "Connection: close",
+             # index.html is usually opened from disk, so it posts cross-origin
+             "Access-Control-Allow-Origin: *", "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+             "Access-Control-Allow-Headers: Content-Type", *extra]
+    return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status, body, extra=()):
+    data = json.dumps(body).encode("utf-8")
+    writer.write(_head(status, extra=(f"Content-Length: {len(data)}", *extra)) + b"\r\n" + data)
+    await writer.drain()
+
+
+async def _send_stream(writer, service, job):
+    """Chunked NDJSON; assignment lines are sent in blocks as they are produced."""
+    writer.write(_head(200, "application/x-ndjson", ("Transfer-Encoding: chunked",)) + b"\r\n")
+    lines = []
+
+    async def flush():
+        if lines:
+            data = "".join(lines).encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            lines.clear()
+            await writer.drain()
+
+    async for event in service.events(job):
+        lines.append(json.dumps(event) + "\n")
+        if "student" not in event or len(lines) >= STREAM_LINES:
+            await flush()
+    await flush()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def handle(service, reader, writer):
+    try:
+        try:
+            request = await _read_request(reader)
+        except OverflowError:
+            return await _send_json(writer, 413, {"error": "Request body too large"})
+        except (ValueError, asyncio.IncompleteReadError):
+            return await _send_json(writer, 400, {"error": "Malformed HTTP request"})
+        if request is None:
+            return
+        method, target, headers, body = request
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        stream = "stream=1" in url.query.split("&") or "ndjson" in headers.get("accept", "")
+
+        if method == "OPTIONS":
+            writer.write(_head(204, extra=("Content-Length: 0",)) + b"\r\n")
+            return await writer.drain()
+        if parts == ["optimize"]:
+            if method != "POST":
+                return await _send_json(writer, 405, {"error": "Use POST"})
+            try:
+                payload = json.loads(body or b"{}")
+                job = service.submit(payload)
+            except (ValueError, TypeError, OverflowError, AttributeError) as exc:
+                return await _send_json(writer, 400, {"error": str(exc)})
+            except asyncio.QueueFull:
+                return await _send_json(writer, 503, {"error": "The job queue is full; try again shortly"},
+                                        ("Retry-After: 5",))
+            if stream:
+                return await _send_stream(writer, service, job)
+            cells = len(payload["students"]) * len(payload["classes"])
+            if payload.get("async") or cells > SYNC_CELLS:
+                return await _send_json(writer, 202, {"job": job.id, "status": job.status, "poll": f"/jobs/{job.id}"})
+            await service.wait(job)
+            if job.result is None:
+                return await _send_json(writer, 500, job.describe())
+            return await _send_json(writer, 200, {"job": job.id, **job.result})
+        if parts == ["stats"] and method == "GET":
+            results = service.results
+            return await _send_json(writer, 200, {"hits": results.hits, "disk_hits": results.disk_hits,
+                                                  "misses": results.misses, "queued": service.queue.qsize()})
+        if len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = service.jobs.get(parts[1])
+            if job is None:
+                return await _send_json(writer, 404, {"error": f"No job {parts[1]}"})
+            if parts[2:] == ["stream"] or (len(parts) == 2 and stream):
+                return await _send_stream(writer, service, job)
+            if len(parts) == 2:
+                return await _send_json(writer, 200, job.describe())
+        return await _send_json(writer, 404, {"error": f"No route for {method} {url.path}"})
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT, workers=2, queue_size=QUEUE_SIZE, time_limit=TIME_LIMIT, ready=None,
+                cache_dir=None):
+    """Runs the service until cancelled; `ready` (a callable) gets the bound port.
+
+    `cache_dir` is the result cache's disk tier (None keeps results in memory only).
+    """
+    service = OptimizationService(workers, queue_size, time_limit, cache_dir)
+    await service.start()
+    server = await asyncio.start_server(lambda r, w: handle(service, r, w), host, port)
+    try:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
@@ -0,0 +1,98 @@
+"""Engine-independent result of an assignment run."""
+import numpy as np
+
+
+def is_integral(values, tol=1e-6):
+    """True when every value is within `tol` of an integer."""
+    values = np.asarray(values, dtype=np.float64)
+    return bool(np.all(np.abs(values - np.rint(values)) <= tol))
+
+
+def edge_amounts(values, tol=1e-6):
+    """Rounds solver values to whole students per edge, within `tol`.
+
+    A value counts as k students once it is at least k - `tol`, so a binary
+    reported as 0.9999999 is still taken.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.floor(values + tol).astype(np.int64)
+
+
+class Solution:
+    """One class index per student (-1 when the student is unassigned).
+
+    `assigned` is aligned with `grid.students`; totals are derived from the
+    grid so every engine reports dissatisfaction the same way.
+    """
+
+    def __init__(self, grid, assigned, max_dissatisfaction, weight_fill=0, status="Optimal", engine="", path=""):
+        self.grid = grid
+        self.assigned = np.asarray(assigned, dtype=np.int64)
+        self.max_dissatisfaction = max_dissatisfaction
+        self.weight_fill = weight_fill
+        self.status = status
+        self.engine = engine
+        # How the engine got there, e.g. "lp" or "lp, fractional -> mip"
+        self.path = path
+        # Set to the Presolve that reduced the grid, when one ran
+        self.presolve = None
+
+    def ranks(self):
+        """Rank paid by each student (0 for unassigned students)."""
+        rows = np.flatnonzero(self.assigned >= 0)
+        ranks = np.zeros(len(self.assigned), dtype=np.int64)
+        rank = self.grid.rank[rows, self.assigned[rows]]
+        ranks[rows] = np.where(rank > 0, rank, self.max_dissatisfaction)
+        return ranks
+
+    def fill_counts(self):
+        """Number of students placed in each class."""
+        placed = self.assigned[self.assigned >= 0]
+        return np.bincount(placed, minlength=len(self.grid.classes))
+
+    def unfilled(self):
+        """Unfilled seats per class."""
+        return np.maximum(self.grid.capacities - self.fill_counts(), 0)
+
+    @property
+    def total_rank(self):
+        return int(self.ranks().sum())
+
+    @property
+    def total_dissatisfaction(self):
+        """Rank cost plus `weight_fill` per unfilled seat, as in the PuLP objective."""
+        return self.total_rank + self.weight_fill * int(self.unfilled().sum())
+
+    def assignments(self):
+        """Returns the {student: (class, rank)} dict the scripts print."""
+        ranks = self.ranks()
+        return {
+            self.grid.students[i]: (self.grid.classes[j], int(ranks[i]))
+            for i, j in enumerate(self.assigned.tolist())
+            if j >= 0
+        }
+
+    def unfilled_classes(self):
+        """Returns the {class: unfilled seats} dict for classes with open seats."""
+        unfilled = self.unfilled()
+        return {self.grid.classes[j]: int(unfilled[j]) for j in np.flatnonzero(unfilled)}
+
+    def unfilled_diagnostics(self):
+        """Returns [(class, unfilled seats, candidates placed elsewhere)] for classes with open seats.
+
+        Candidates come from the grid's class -> candidates index, so the
+        whole report is a handful of array operations instead of a scan of
+        every (student, class) pair per class.
+        """
+        indptr, candidates = self.grid.class_candidates()
+        unfilled = self.unfilled()
+        report = []
+        for j in np.flatnonzero(unfilled).tolist():
+            students = candidates[indptr[j]:indptr[j + 1]]
+            waiting = students[self.assigned[students] != j]
+            report.append((self.grid.classes[j], int(unfilled[j]), [self.grid.students[i] for i in waiting]))
+        return report
+
+    def unassigned(self):
+        """Students the engine could not place in any class."""
+        return [self.grid.students[i] for i in np.flatnonzero(self.assigned < 0)]
@@ -0,0 +1,136 @@
+"""Parameter sweeps over max_dissatisfaction and weight_fill.
+
+The instance is parsed once and saved as a compiled instance that every
+worker memory-maps, so the grid is neither re-read nor pickled per point.
+Points are solved in chains of increasing weight_fill for a fixed
+max_dissatisfaction. With the "cbc" engine in "mip" mode each solve in a
+chain is warm-started from the previous point's assignment (a CBC MIP
+start); in "auto" mode the LP path is faster than a warm-started MIP and
+the other engines take no warm start, so their points are solved cold.
+The result is one row per point: objective, rank total, unfilled seats
+and a rank histogram.
+"""
+import csv
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+COLUMNS = ("max_dissatisfaction", "weight_fill", "status", "total_dissatisfaction", "total_rank", "unfilled_seats",
+           "assigned", "seconds", "path")
+
+_GRID = None  # The instance each worker process solves
+
+
+def _share_grid(grid_or_path):
+    """Process-pool initializer: memory-maps the compiled instance once per worker."""
+    global _GRID
+    if isinstance(grid_or_path, str):
+        from .instance import load_instance
+
+        grid_or_path = load_instance(grid_or_path)
+    _GRID = grid_or_path
+
+
+def chains(max_dissatisfactions, weight_fills, workers=1):
+    """Splits the grid of points into warm-start chains, about one per worker.
+
+    Each chain keeps max_dissatisfaction fixed and walks weight_fill upwards,
+    so consecutive points are neighbours.
+    """
+    rows = [[(d, w) for w in sorted(set(weight_fills))] for d in sorted(set(max_dissatisfactions))]
+    size = max(1, math.ceil(sum(map(len, rows)) / max(workers, 1)))
+    return [row[k:k + size] for row in rows for k in range(0, len(row), size)]
+
+
+def rank_histogram(solution, max_rank):
+    """Students placed at each rank: index 0 counts available but unranked classes."""
+    rows = np.flatnonzero(solution.assigned >= 0)
+    ranks = solution.grid.rank[rows, solution.assigned[rows]].astype(np.int64)
+    return np.bincount(ranks, minlength=max_rank + 1).tolist()
+
+
+def _solve_chain(job):
+    from .engines import solve
+
+    chain, engine, mode, presolve, time_limit = job
+    max_rank = int(_GRID.rank.max(initial=0))
+    chained = engine == "cbc" and mode == "mip"
+    rows, previous = [], None
+    for max_dissatisfaction, weight_fill in chain:
+        solver = None
+        if engine == "cbc":
+            from pulp import PULP_CBC_CMD
+
+            solver = PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=previous is not None)
+        start = time.perf_counter()
+        solution = solve(_GRID, engine, max_dissatisfaction, weight_fill, solver=solver, mode=mode,
+                         presolve=presolve, time_limit=time_limit, warm_start=previous)
+        seconds = time.perf_counter() - start
+        rows.append({
+            "max_dissatisfaction": max_dissatisfaction,
+            "weight_fill": weight_fill,
+            "status": solution.status,
+            "total_dissatisfaction": solution.total_dissatisfaction,
+            "total_rank": solution.total_rank,
+            "unfilled_seats": int(solution.unfilled().sum()),
+            "assigned": int((solution.assigned >= 0).sum()),
+            "seconds": round(seconds, 3),
+            "path": solution.path,
+            "histogram": rank_histogram(solution, max_rank),
+        })
+        if chained and solution.status == "Optimal":
+            previous = solution.assigned
+    return rows
+
+
+def sweep(grid, max_dissatisfactions, weight_fills, engine="cbc", mode="auto", presolve=True, time_limit=None,
+          workers=None):
+    """Solves every (max_dissatisfaction, weight_fill) pair; returns the rows sorted by both.
+
+    `workers` processes (None uses every core) each memory-map one shared
+    compiled instance; with a single worker or chain everything runs here.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(chain, engine, mode, presolve, time_limit)
+            for chain in chains(max_dissatisfactions, weight_fills, workers)]
+    if workers == 1 or len(jobs) == 1:
+        _share_grid(grid)
+        results = [_solve_chain(job) for job in jobs]
+    else:
+        from .instance import save_instance
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sweep.grid")
+            save_instance(grid, path)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_share_grid, initargs=(path,)) as pool:
+                results = list(pool.map(_solve_chain, jobs))
+    rows = [row for chain in results for row in chain]
+    return sorted(rows, key=lambda row: (row["max_dissatisfaction"], row["weight_fill"]))
+
+
+def histogram_columns(rows):
+    width = max((len(row["histogram"]) for row in rows), default=1)
+    return ["unranked"] + [f"rank {r}" for r in range(1, width)]
+
+
+def table_lines(rows):
+    """The sweep as aligned text lines for the console."""
+    header = list(COLUMNS[:-1]) + histogram_columns(rows)
+    body = [
+        [str(row[column]) for column in COLUMNS[:-1]] + [str(count) for count in row["histogram"]]
+        for row in rows
+    ]
+    widths = [max(len(line[k]) for line in [header] + body if k < len(line)) for k in range(len(header))]
+    return ["  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in [header] + body]
+
+
+def write_table(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(list(COLUMNS) + histogram_columns(rows))
+        for row in rows:
+            writer.writerow([row[column] for column in COLUMNS] + row["histogram"])
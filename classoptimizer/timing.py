@@ -0,0 +1,131 @@
+"""Phase-level timing of an optimization run, with optional cProfile capture.
+
+Each step of the pipeline runs inside a phase: reading and parsing the
+sheets, presolve, building the rankings (the feasible pairs), compressing
+identical students and sections, building the model, the solver call,
+extracting the assignment and writing the report. A phase records its
+wall and CPU time plus the counts it reports (students, pairs, model
+variables, rows and nonzeros...). Phases nest, and each keeps its
+inclusive time, so "solve" holds the rank build, compress, model build,
+solver and extract phases run inside it.
+
+The engines call the module-level `phase()`, which does nothing unless a
+PhaseTimer is active, so no solver takes an extra argument. Phases run in
+solver worker processes (`workers` other than 1) are not seen; the
+enclosing phase still covers them. With `profile_dir` every phase runs
+under cProfile and is dumped to its own .prof file (open it with pstats or
+snakeviz); a phase's profile leaves out the phases nested in it.
+"""
+import cProfile
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+RECORD_VERSION = 1
+PROFILE_NAME = re.compile(r"[^\w]+")  # Runs of characters left out of .prof file names
+_active = ContextVar("phase_timer", default=None)
+
+
+class PhaseTimer:
+    """Records the phases of one run; `phases` lists them in the order they started."""
+
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.phases = []
+        self._open = []  # (record, profiler) of the running phases, outermost first
+
+    @contextmanager
+    def phase(self, name, **counts):
+        """Times the enclosed block; yields its counts dict for the block to fill in."""
+        record = {"phase": name, "depth": len(self._open), "wall_s": 0.0, "cpu_s": 0.0, "counts": dict(counts)}
+        self.phases.append(record)
+        number = len(self.phases)
+        profiler = self._start_profile()
+        self._open.append((record, profiler))
+        token = _active.set(self)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record["counts"]
+        finally:
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            _active.reset(token)
+            self._open.pop()
+            if profiler is not None:
+                profiler.disable()
+                record["profile"] = self._dump(profiler, number, name)
+                if self._open and self._open[-1][1] is not None:
+                    self._open[-1][1].enable()
+
+    def _start_profile(self):
+        if self.profile_dir is None:
+            return None
+        # Only one profiler can run at a time: pause the enclosing phase's
+        if self._open and self._open[-1][1] is not None:
+            self._open[-1][1].disable()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None  # Another profiler (e.g. python -m cProfile) is already running
+        return profiler
+
+    def _dump(self, profiler, number, name):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{number:02d}-{PROFILE_NAME.sub('_', name)}.prof")
+        profiler.dump_stats(path)
+        return path
+
+    def count(self, **counts):
+        """Adds counts to the innermost running phase."""
+        if self._open:
+            self._open[-1][0]["counts"].update(counts)
+
+    def record(self, **run):
+        """The structured timing record: `run` details, totals and every phase."""
+        top = [p for p in self.phases if p["depth"] == 0]
+        phases = [dict(p, wall_s=round(p["wall_s"], 6), cpu_s=round(p["cpu_s"], 6)) for p in self.phases]
+        return {
+            "version": RECORD_VERSION,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **run,
+            "wall_s": round(sum(p["wall_s"] for p in top), 6),
+            "cpu_s": round(sum(p["cpu_s"] for p in top), 6),
+            "phases": phases,
+        }
+
+    def write_record(self, path, **run):
+        """Appends the record to `path` as one JSON line."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.record(**run), default=str) + "\n")
+
+    def lines(self):
+        """The phases as an indented table, one line each."""
+        width = max((2 * p["depth"] + len(p["phase"]) for p in self.phases), default=5)
+        lines = [f"  {'phase':<{width}}     wall      cpu  counts"]
+        for p in self.phases:
+            name = "  " * p["depth"] + p["phase"]
+            counts = ", ".join(f"{key}={value}" for key, value in p["counts"].items())
+            lines.append(f"  {name:<{width}} {p['wall_s']:>7.3f}s {p['cpu_s']:>7.3f}s  {counts}".rstrip())
+        return lines
+
+
+@contextmanager
+def phase(name, **counts):
+    """PhaseTimer.phase on the active timer; without one only yields a scratch counts dict."""
+    timer = _active.get()
+    if timer is None:
+        yield dict(counts)
+        return
+    with timer.phase(name, **counts) as phase_counts:
+        yield phase_counts
+
+
+def count(**counts):
+    """Adds counts to the innermost running phase, if a timer is active."""
+    timer = _active.get()
+    if timer is not None:
+        timer.count(**counts)
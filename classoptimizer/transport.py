@@ -0,0 +1,55 @@
+"""Capacity-aware assignment solved as a transportation LP with SciPy/HiGHS."""
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+
+from .solution import Solution
+
+
+def solve_capacitated_assignment(grid, max_dissatisfaction=10, weight_fill=0):
+    """Assigns each student to at most one class without expanding seats.
+
+    The cost matrix stays at class granularity in a compact integer dtype and
+    only feasible pairs become LP columns, with one "unassigned" column per
+    student priced above any achievable rank total. The constraint matrix is
+    totally unimodular, so the simplex vertex is integral: the result places
+    as many students as `linear_sum_assignment` on the slot-expanded matrix
+    would and reaches the same optimal total, but reports students that
+    cannot be placed (with status "Infeasible") instead of failing on `inf`
+    entries.
+    """
+    num_students, num_classes = grid.shape
+    costs = grid.costs(max_dissatisfaction)
+    student, cls = np.nonzero(grid.feasible())
+    num_edges = len(student)
+
+    # Leaving a student out must cost more than any reshuffle of the others
+    unassigned_cost = int(costs.max(initial=0)) * (num_students + 1) + 1
+    c = np.concatenate([costs[student, cls].astype(np.float64), np.full(num_students, float(unassigned_cost))])
+
+    # One row per student: its feasible edges plus its unassigned column sum to 1
+    num_columns = num_edges + num_students
+    columns = np.arange(num_columns)
+    rows = np.concatenate([student, np.arange(num_students)])
+    student_rows = coo_matrix((np.ones(num_columns), (rows, columns)), shape=(num_students, num_columns))
+    # One row per class: the students placed there stay within capacity
+    class_rows = coo_matrix((np.ones(num_edges), (cls, columns[:num_edges])), shape=(num_classes, num_columns))
+
+    result = linprog(
+        c,
+        A_ub=class_rows.tocsr(),
+        b_ub=grid.capacities.astype(np.float64),
+        A_eq=student_rows.tocsr(),
+        b_eq=np.ones(num_students),
+        bounds=(0, 1),
+        method="highs-ds",
+    )
+    assigned = np.full(num_students, -1, dtype=np.int64)
+    if result.status != 0:
+        return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=result.message, engine="scipy")
+
+    chosen = result.x[:num_edges] > 0.5
+    assigned[student[chosen]] = cls[chosen]
+    # Students left in their unassigned column make the model infeasible, as in flow.py
+    status = "Optimal" if (assigned >= 0).all() else "Infeasible"
+    return Solution(grid, assigned, max_dissatisfaction, weight_fill, status=status, engine="scipy")
@@ -0,0 +1,243 @@
+"""Watch-folder mode: re-optimize whenever a new student or class workbook lands.
+
+    python -m classoptimizer watch responses/ --out responses/assignments.csv
+
+The folder is polled for the newest file matching each pattern (so a
+re-download saved as "student_rankings (3).xlsx" is picked up too). A file
+is only read once its size and modification time have stopped changing.
+Every student row is hashed, by name and by the rank and availability it
+gives each class, so each refresh reports which students were added,
+changed or removed; an unchanged class sheet is not re-read, and a
+refresh that changes no row is not re-solved. Otherwise the previous
+assignment of every unchanged student is the starting point of the new
+solve (a CBC MIP start, so the "cbc" engine solves the MIP directly; the
+other engines ignore it and solve from scratch), and the result replaces
+the output CSV in one atomic rename, so readers never see a half-written
+file.
+"""
+import csv
+import fnmatch
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+STUDENT_PATTERN = "student*"
+CLASS_PATTERN = "class*"
+EXTENSIONS = (".xlsx", ".xls", ".csv", ".parquet", ".feather")
+INTERVAL = 5.0  # Seconds between polls
+OUTPUT_COLUMNS = ("student", "class", "rank")
+
+
+def latest_file(directory, pattern, exclude=()):
+    """Newest schedule file in `directory` matching `pattern`, or None (Excel lock files are skipped)."""
+    newest, newest_time = None, None
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if (name.startswith(("~$", ".")) or os.path.splitext(name)[1].lower() not in EXTENSIONS
+                or not fnmatch.fnmatch(name.lower(), pattern.lower()) or os.path.abspath(path) in exclude):
+            continue
+        try:
+            modified = os.stat(path).st_mtime
+        except OSError:
+            continue
+        if newest_time is None or modified > newest_time:
+            newest, newest_time = path, modified
+    return newest
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_keys(grid):
+    """One key per student row: the name, numbered from the second student with the same name."""
+    seen, keys = {}, []
+    for student in grid.students:
+        seen[student] = seen.get(student, 0) + 1
+        keys.append(student if seen[student] == 1 else f"{student} #{seen[student]}")
+    return keys
+
+
+def row_digests(grid):
+    """{row key: hash of the rank and availability the student gave each class}.
+
+    Classes the student neither ranked nor marked available are left out,
+    so adding a class nobody picked changes no row.
+    """
+    classes = [str(c) for c in grid.classes]
+    digests = {}
+    for key, rank, available in zip(row_keys(grid), grid.rank.tolist(), np.asarray(grid.available).tolist()):
+        cells = "\0".join(f"{classes[j]}={rank[j]}:{int(ok)}" for j, ok in enumerate(available) if ok or rank[j])
+        digests[key] = hashlib.blake2b(cells.encode("utf-8"), digest_size=16).digest()
+    return digests
+
+
+def diff_rows(old, new):
+    """(added, changed, removed) row keys between two row_digests results."""
+    added = [key for key in new if key not in old]
+    changed = [key for key in new if key in old and old[key] != new[key]]
+    removed = [key for key in old if key not in new]
+    return added, changed, removed
+
+
+def carry_over(previous, grid, keep):
+    """Warm start for `grid`: the previous class of every student in `keep`, -1 for the rest.
+
+    Classes that were removed, the student can no longer take (neither
+    ranked nor available), or that would be over capacity are left for the
+    solver to decide.
+    """
+    old_class = dict(zip(row_keys(previous.grid), (previous.grid.classes[j] if j >= 0 else None
+                                                   for j in previous.assigned.tolist())))
+    column = {c: j for j, c in enumerate(grid.classes)}
+    feasible = grid.feasible()
+    left = np.asarray(grid.capacities, dtype=np.int64).copy()
+    start = np.full(len(grid.students), -1, dtype=np.int64)
+    for i, key in enumerate(row_keys(grid)):
+        j = column.get(old_class.get(key)) if key in keep else None
+        if j is not None and feasible[i, j] and left[j] > 0:
+            start[i] = j
+            left[j] -= 1
+    return start
+
+
+def publish(solution, path):
+    """Writes the assignment CSV next to `path` and renames it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    ranks = solution.ranks()
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(OUTPUT_COLUMNS)
+            for i, j in enumerate(solution.assigned.tolist()):
+                if j >= 0:
+                    writer.writerow((solution.grid.students[i], solution.grid.classes[j], int(ranks[i])))
+                else:
+                    writer.writerow((solution.grid.students[i], "", ""))
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+class Watcher:
+    """Polls one folder and keeps the published assignment up to date.
+
+    `settings` are engines.solve keywords (engine, max_dissatisfaction,
+    weight_fill, mode, presolve, time_limit).
+    """
+
+    def __init__(self, directory, out_path, report, student_pattern=STUDENT_PATTERN, class_pattern=CLASS_PATTERN,
+                 sanitize=None, **settings):
+        self.directory = directory
+        self.out_path = out_path
+        self.report = report
+        self.student_pattern = student_pattern
+        self.class_pattern = class_pattern
+        self.sanitize = sanitize
+        self.settings = settings
+        self.seen = {}  # path -> (size, mtime) on the last poll
+        self.loaded = {}  # "student"/"class" -> (path, size, mtime, digest) last read
+        self.classes = None
+        self.digests = {}
+        self.solution = None
+
+    def _settled(self, kind, path):
+        """True when `path` differs from what was last read and is unchanged since the previous poll."""
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime)
+        previous, self.seen[path] = self.seen.get(path), signature
+        loaded = self.loaded.get(kind)
+        return previous == signature and (loaded is None or loaded[:3] != (path, *signature))
+
+    def poll(self):
+        """Checks the folder once; returns the new Solution, or None when nothing was published."""
+        exclude = {os.path.abspath(self.out_path)}
+        student_file = latest_file(self.directory, self.student_pattern, exclude)
+        class_file = latest_file(self.directory, self.class_pattern, exclude)
+        if student_file is None or class_file is None:
+            return None
+        try:
+            ready = [kind for kind, path in (("student", student_file), ("class", class_file))
+                     if self._settled(kind, path)]
+        except OSError:
+            return None  # Replaced while we looked; try again next poll
+        if not ready or any(kind not in self.loaded and kind not in ready for kind in ("student", "class")):
+            return None
+        try:
+            return self.refresh(student_file, class_file, ready)
+        except Exception as exc:
+            # A half-synced or malformed sheet: keep the last result and wait for the next save
+            self.report.summary(f"❌ Could not refresh from {os.path.basename(student_file)}: "
+                                f"{type(exc).__name__}: {exc}")
+            return None
+
+    def _record(self, kind, path):
+        stat = os.stat(path)
+        digest = file_digest(path)
+        unchanged = kind in self.loaded and self.loaded[kind][3] == digest
+        self.loaded[kind] = (path, stat.st_size, stat.st_mtime, digest)
+        return unchanged
+
+    def refresh(self, student_file, class_file, ready=("student", "class")):
+        """Re-reads what changed, re-optimizes if any row did and publishes the result."""
+        from .engines import solve
+        from .ingest import read_class_file, read_student_file
+
+        start = time.perf_counter()
+        same_students = "student" not in ready or self._record("student", student_file)
+        same_classes = "class" not in ready or self._record("class", class_file)
+        if same_students and same_classes and self.solution is not None:
+            return None
+        classes = self.classes
+        if classes is None or not same_classes:
+            classes = read_class_file(class_file, self.sanitize)
+        grid = read_student_file(student_file, classes, self.sanitize)
+        digests = row_digests(grid)
+        added, changed, removed = diff_rows(self.digests, digests)
+        classes_changed = self.classes is not None and classes != self.classes
+        self.classes, self.digests = classes, digests
+        self.report.summary(f"📥 {os.path.basename(student_file)}: {len(added)} added, {len(changed)} changed, "
+                            f"{len(removed)} removed" + (" (class sheet changed)" if classes_changed else ""))
+        if self.solution is not None and not (added or changed or removed or classes_changed):
+            return None
+
+        settings = dict(self.settings)
+        warm_start = None
+        if self.solution is not None:
+            keep = set(digests) - set(added) - set(changed)
+            warm_start = carry_over(self.solution, grid, keep)
+        if settings.get("engine", "cbc") == "cbc":
+            from pulp import PULP_CBC_CMD
+
+            settings["solver"] = PULP_CBC_CMD(msg=False, timeLimit=settings.get("time_limit"),
+                                              warmStart=warm_start is not None)
+        solution = solve(grid, workers=1, warm_start=warm_start, **settings)
+        if solution.status != "Optimal":
+            self.report.summary(f"⚠️ Solver status {solution.status}; keeping the previous result")
+            return None
+        publish(solution, self.out_path)
+        self.solution = solution
+        self.report.summary(f"✅ Total Dissatisfaction {solution.total_dissatisfaction}, "
+                            f"{len(solution.unassigned())} unplaced -> {self.out_path} "
+                            f"({time.perf_counter() - start:.2f}s)")
+        return solution
+
+    def run(self, interval=INTERVAL, polls=None):
+        """Polls every `interval` seconds, forever or `polls` times."""
+        count = 0
+        while polls is None or count < polls:
+            self.poll()
+            self.report.flush()
+            count += 1
+            if polls is None or count < polls:
+                time.sleep(interval)